@@ -0,0 +1,513 @@
+"""Offline benchmarks for the unique list. No Discord connection is needed.
+
+Usage:
+    python benchmarks.py                    # micro benchmarks
+    python benchmarks.py suite [--sizes 100,10000] [--output results.json] [--baseline old.json]
+
+The suite times every stage of the list pipeline (load, sort, format, render, forge
+update, save) on synthetic data.json files and writes the results as JSON, so two
+versions can be compared with --baseline.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import list_bot
+
+
+def make_rows(n: int, seed: int = 1):
+    """Builds n rows shaped like data.json entries: [item, name, cost, timestamp]."""
+    rnd = random.Random(seed)
+    owners = ["".join(rnd.choices(string.ascii_letters + "_-", k=rnd.randint(3, 12))) for _ in range(max(1, n // 8))]
+    now = time.time()
+    return [
+        [f"Item {i:07d}", rnd.choice(owners), str(rnd.randint(1, 40)), now - rnd.randint(0, 60 * 86400)]
+        for i in range(n)
+    ]
+
+
+def legacy_update(data_list, item_val, name_val):
+    """The pre-ListStore forge update: linear scan, pop, append."""
+    found_idx = -1
+    final_cost = "1"
+    for i, row in enumerate(data_list):
+        if row[0].lower() == item_val.lower():
+            found_idx = i
+            break
+    if found_idx != -1:
+        existing_row = data_list.pop(found_idx)
+        existing_row[1] = name_val
+        try:
+            final_cost = str(int(existing_row[2]) + 1)
+        except ValueError:
+            final_cost = "1"
+        existing_row[2] = final_cost
+        existing_row[3] = time.time()
+        data_list.append(existing_row)
+    else:
+        data_list.append([item_val, name_val, final_cost, time.time()])
+    return final_cost
+
+
+def bench_views(sizes=(1_000, 100_000)):
+    """Reading a view: sort lambda vs materialized store view."""
+    print(f"{'rows':>10} {'view':>8} {'lambda ms':>10} {'store ms':>9}")
+    for n in sizes:
+        store = list_bot.ListStore(make_rows(n))
+        rows = store.rows()
+        for key, cfg in list_bot.SORT_CONFIGS.items():
+            start = time.perf_counter()
+            cfg["sort_lambda"](rows)
+            mid = time.perf_counter()
+            store.sorted_rows(cfg["store_view"])
+            end = time.perf_counter()
+            print(f"{n:>10} {cfg['store_view']:>8} {(mid - start) * 1e3:>10.2f} {(end - mid) * 1e3:>9.2f}")
+
+
+def bench_click_storm(n: int = 10_000, clicks: int = 2_000, forge_every: int = 200):
+    """Ephemeral view clicks with an occasional forge in between: full render of every
+    part (the old click) vs rendering only the requested page."""
+    keys = list(list_bot.SORT_CONFIGS)
+
+    def run(click):
+        list_bot.list_store.replace(make_rows(n))
+        list_bot.render_cache = list_bot.RenderCache()
+        list_bot._list_pages_cache = {}
+        rnd = random.Random(3)
+        start = time.perf_counter()
+        for i in range(clicks):
+            if i % forge_every == 0:
+                list_bot.list_store.upsert(f"Item {rnd.randrange(n):07d}", "Forger")
+            click(rnd.choice(keys), rnd.randrange(10))
+        return time.perf_counter() - start
+
+    loop = asyncio.new_event_loop()
+    full = run(lambda key, page: loop.run_until_complete(list_bot.render_list_content(key, is_ephemeral=True)))
+    paged = run(lambda key, page: loop.run_until_complete(list_bot.render_list_page(key, page)))
+    loop.close()
+    print(f"click storm: {clicks} clicks on {n} rows, full render {full / clicks * 1e3:.3f} ms/click, "
+          f"one page {paged / clicks * 1e3:.3f} ms/click")
+
+
+class FakeMessage:
+    def __init__(self, channel, message_id):
+        self.channel = channel
+        self.id = message_id
+
+    async def edit(self, content=None, view=None):
+        await self.channel.call("edit")
+        return self
+
+    async def delete(self):
+        await self.channel.call("delete")
+
+
+class FakeChannel:
+    """Text channel stand-in with a fixed REST round-trip latency."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, channel_id: int, latency: float):
+        self.id = channel_id
+        self.latency = latency
+        self.calls = 0
+
+    async def call(self, kind):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    def get_partial_message(self, message_id):
+        return FakeMessage(self, message_id)
+
+    async def send(self, content=None, view=None, **kwargs):
+        await self.call("send")
+        return FakeMessage(self, next(self._ids))
+
+
+def bench_refresh_fanout(channel_counts=(1, 5, 10), n: int = 400, latency: float = 0.05):
+    """Wall-clock time of update_all_persistent_list_prompts for N channels, each
+    with a fixed REST latency, sequential (concurrency 1) vs concurrent fan-out."""
+    list_bot.list_store.replace(make_rows(n))
+    list_bot.client.add_view = lambda view, message_id=None: None
+
+    async def refresh(count, concurrency):
+        channels = {cid: FakeChannel(cid, latency) for cid in range(1, count + 1)}
+        list_bot.client.get_channel = channels.get
+        list_bot.INTERACTIVE_LIST_TARGET_CHANNEL_IDS = list(channels)
+        list_bot.LIST_SYNC_CONCURRENCY = concurrency
+        list_bot.channel_list_states = {}
+        list_bot.list_store.upsert("Item 0000000", "Forger")
+        await list_bot.update_all_persistent_list_prompts(force_new=True)
+        return list_bot.list_sync_stats["last_refresh_seconds"], sum(c.calls for c in channels.values())
+
+    print(f"{'channels':>8} {'sequential s':>13} {'fan-out s':>10} {'calls':>6}   ({latency * 1e3:.0f} ms per call)")
+    for count in channel_counts:
+        sequential, calls = asyncio.run(refresh(count, 1))
+        fanout, _ = asyncio.run(refresh(count, count))
+        print(f"{count:>8} {sequential:>13.2f} {fanout:>10.2f} {calls:>6}")
+
+
+async def legacy_on_message(m):
+    """The pre-restructure on_message: lowercase, scan every trigger and await the reaction,
+    roll the fun fact, and only then check for the forge bot."""
+    content = m.content.lower()
+    if any(trigger in content for trigger in list_bot.TRIGGERS):
+        await m.add_reaction(list_bot.EMOJI)
+    if random.randint(1, 100) == 1:
+        await m.channel.send("Fun fact: Manfred is p2w")
+    if m.author.id == list_bot.TARGET_BOT_ID_FOR_AUTO_UPDATES:
+        list_bot._handle_forge_message(m)
+
+
+def make_messages(count: int, forge_share: float = 0.01, trigger_share: float = 0.05, seed: int = 5):
+    """Synthetic chat traffic: mostly ordinary messages, some triggers, a few forge-bot posts."""
+    rnd = random.Random(seed)
+
+    async def no_op(*args, **kwargs):
+        return None
+
+    channel = SimpleNamespace(send=no_op)
+    words = ["petal", "craft", "lol", "ultra", "garden", "anyone", "trade", "rice", "server", "hello"]
+    messages = []
+    for i in range(count):
+        roll = rnd.random()
+        if roll < forge_share:
+            author_id = list_bot.TARGET_BOT_ID_FOR_AUTO_UPDATES
+            content = f"The Unique Item {rnd.randrange(5000):07d} has been forged by Player{rnd.randrange(300)}!"
+        else:
+            author_id = rnd.randrange(10**17, 10**18)
+            text = " ".join(rnd.choices(words, k=rnd.randint(3, 40)))
+            content = text + (" magic stick" if roll < forge_share + trigger_share else "")
+        messages.append(SimpleNamespace(author=SimpleNamespace(id=author_id), content=content,
+                                        channel=channel, add_reaction=no_op))
+    return messages
+
+
+def bench_on_message(count: int = 50_000, reaction_latency: float = 0.005, forge_samples: int = 100):
+    """Messages per second through on_message vs the legacy handler on synthetic traffic, and how
+    long a forge-bot post waits before the list is updated when reactions take a round trip."""
+    messages = make_messages(count)
+    list_bot.list_store.replace(make_rows(5000))
+    list_bot.client.get_channel = lambda cid: None
+
+    async def throughput(handler):
+        # The scheduler's events bind to the loop they are first used on; give each run its own.
+        list_bot.list_refresh_scheduler = list_bot.ListRefreshScheduler()
+        begin = time.perf_counter()
+        for m in messages:
+            await handler(m)
+        elapsed = time.perf_counter() - begin
+        # Let the spawned reactions / refreshes run so they are not left pending.
+        await asyncio.sleep(0)
+        return count / elapsed
+
+    async def slow_reaction(*args, **kwargs):
+        await asyncio.sleep(reaction_latency)
+
+    async def forge_latency(handler):
+        list_bot.list_refresh_scheduler = list_bot.ListRefreshScheduler()
+        total = 0.0
+        for m in forges:
+            version = list_bot.list_store.version
+            begin = time.perf_counter()
+            task = asyncio.create_task(handler(m))
+            while list_bot.list_store.version == version:
+                await asyncio.sleep(0)
+            total += time.perf_counter() - begin
+            await task
+        await asyncio.gather(*list_bot._background_tasks)
+        return total / len(forges) * 1000
+
+    legacy = asyncio.run(throughput(legacy_on_message))
+    current = asyncio.run(throughput(list_bot.on_message))
+    print(f"on_message: {current:,.0f} msg/s (legacy: {legacy:,.0f} msg/s) over {count} messages")
+
+    # Every forge post contains "Unique", so it also matches a trigger.
+    forges = [m for m in messages if m.author.id == list_bot.TARGET_BOT_ID_FOR_AUTO_UPDATES][:forge_samples]
+    for m in forges:
+        m.add_reaction = slow_reaction
+
+    legacy = asyncio.run(forge_latency(legacy_on_message))
+    current = asyncio.run(forge_latency(list_bot.on_message))
+    print(f"forge applied after: {current:.3f} ms (legacy: {legacy:.3f} ms) "
+          f"with {reaction_latency * 1000:.0f} ms reactions")
+
+
+def bench_recent(sizes=(1_000, 10_000, 100_000), windows=("24h", "7d", "30d")):
+    """"Updated in the last N" queries: filtering every row vs bisecting the time index."""
+    print(f"{'rows':>10} {'window':>7} {'hits':>7} {'scan ms':>8} {'index ms':>9}")
+    for n in sizes:
+        store = list_bot.ListStore(make_rows(n))
+        for window in windows:
+            since = time.time() - list_bot.parse_recent_window(window)
+            repeat = max(3, 200_000 // n)
+            begin = time.perf_counter()
+            for _ in range(repeat):
+                expected = sorted([r for r in store if len(r) > 3 and r[3] >= since][::-1],
+                                  key=lambda r: r[3], reverse=True)
+            scan = (time.perf_counter() - begin) / repeat * 1000
+            begin = time.perf_counter()
+            for _ in range(repeat):
+                actual = store.recent_rows(since)
+            index = (time.perf_counter() - begin) / repeat * 1000
+            assert actual == expected
+            print(f"{n:>10} {window:>7} {len(actual):>7} {scan:>8.3f} {index:>9.3f}")
+
+
+def bench_autocomplete(sizes=(10_000, 1_000_000), queries: int = 2_000):
+    """Per-keystroke item/owner suggestions: scanning every row vs the store's prefix indexes."""
+    print(f"{'rows':>10} {'scan us':>9} {'index us':>9}")
+    for n in sizes:
+        store = list_bot.ListStore(make_rows(n))
+        rnd = random.Random(n)
+        rows = store.rows()
+        # What a user has typed so far: a prefix of an existing item or owner.
+        prefixes = [rnd.choice(rows)[rnd.randrange(2)][:rnd.randint(1, 8)] for _ in range(queries)]
+
+        def scan(prefix):
+            prefix = prefix.lower()
+            items = sorted(r.item for r in rows if r.item.lower().startswith(prefix))[:25]
+            owners = sorted({r.name.lower() for r in rows if r.name.lower().startswith(prefix)})[:25]
+            return items, owners
+
+        scan_repeat = max(3, min(queries, 2_000_000 // n))
+        scan_us = _per_op_us(scan, prefixes, scan_repeat)
+        index_us = _per_op_us(lambda p: (store.complete_items(p), store.complete_owners(p)), prefixes, queries)
+        print(f"{n:>10} {scan_us:>9.1f} {index_us:>9.1f}")
+
+
+def bench_row_types(n: int = 100_000):
+    """Memory and CPU of n rows as plain JSON arrays (string cost) vs ListRow."""
+    text = json.dumps([[r[0], r[1], r[2], r[3]] for r in make_rows(n)])
+
+    def traced_bytes(build):
+        tracemalloc.start()
+        rows = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return rows, size
+
+    def best_of(fn, repeat=3):
+        timings = []
+        for _ in range(repeat):
+            begin = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - begin)
+        return min(timings) * 1000
+
+    def load_lists():
+        # json.loads plus the row patch-up load_data_list used to do.
+        rows = json.loads(text)
+        for row in rows:
+            if len(row) > 2:
+                row[2] = str(row[2])
+            if len(row) < 4:
+                row.append(0)
+        return rows
+
+    load_typed = lambda: list_bot.ListRow.from_json_rows(json.loads(text))
+    lists, list_bytes = traced_bytes(load_lists)
+    typed, typed_bytes = traced_bytes(load_typed)
+    list_load, typed_load = best_of(load_lists), best_of(load_typed)
+    legacy_cost = lambda x: (int(x[2]) if str(x[2]).isdigit() else 0, x[0].lower())
+    list_sort = best_of(lambda: sorted(lists, key=legacy_cost))
+    typed_sort = best_of(lambda: sorted(typed, key=lambda x: (x.cost, x.item.lower())))
+    print(f"{n} rows       {'lists':>12} {'ListRow':>12}")
+    print(f"memory        {list_bytes / 2**20:>10.1f}MB {typed_bytes / 2**20:>10.1f}MB")
+    print(f"load JSON     {list_load:>10.1f}ms {typed_load:>10.1f}ms")
+    print(f"sort by cost  {list_sort:>10.1f}ms {typed_sort:>10.1f}ms")
+
+
+def _per_op_us(fn, items, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(items[i % len(items)])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def bench_forge(sizes=(100, 10_000, 1_000_000)):
+    """Per-forge latency of the list update, legacy scan vs ListStore."""
+    print(f"{'rows':>10} {'legacy us/forge':>16} {'store us/forge':>15}")
+    for n in sizes:
+        rows = make_rows(n)
+        rnd = random.Random(n)
+        # Forges hit existing items spread over the whole list.
+        targets = [rows[rnd.randrange(n)][0] for _ in range(64)]
+
+        legacy_rows = [list(r) for r in rows]
+        legacy_repeat = max(5, min(2000, 2_000_000 // n))
+        legacy = _per_op_us(lambda it: legacy_update(legacy_rows, it, "Forger"), targets, legacy_repeat)
+
+        store = list_bot.ListStore([list(r) for r in rows])
+        keyed = _per_op_us(lambda it: store.upsert(it, "Forger"), targets, 20_000)
+        print(f"{n:>10} {legacy:>16.2f} {keyed:>15.2f}")
+
+
+SUITE_SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+SUITE_FORGES = 1_000
+
+
+def _pipeline_stages(n: int):
+    """(stage, ops, callable) for one list size, in pipeline order. Runs in the data directory."""
+    stages = [("load_data_list", 1, list_bot.load_data_list)]
+    for key, cfg in list_bot.SORT_CONFIGS.items():
+        stages.append((f"sort_lambda:{key}", 1, lambda cfg=cfg: cfg["sort_lambda"](list_bot.list_store.rows())))
+    for key, cfg in list_bot.SORT_CONFIGS.items():
+        stages.append((f"format_list_for_display:{key}", 1, lambda cfg=cfg: list_bot.format_list_for_display(
+            list_bot.list_store.sorted_rows(cfg["store_view"]), cfg["column_order_indices"], cfg["headers"])))
+
+    async def render_all():
+        for key in list_bot.SORT_CONFIGS:
+            await list_bot.render_list_content(key)
+
+    def render_cold():
+        list_bot.render_cache = list_bot.RenderCache()
+        asyncio.run(render_all())
+
+    def render_warm():
+        asyncio.run(render_all())
+
+    stages.append(("render_list_content:cold", len(list_bot.SORT_CONFIGS), render_cold))
+    stages.append(("render_list_content:warm", len(list_bot.SORT_CONFIGS), render_warm))
+
+    rnd = random.Random(n)
+    forges = [(f"Item {rnd.randrange(n):07d}", f"Forger{rnd.randrange(50)}") for _ in range(SUITE_FORGES)]
+
+    def forge_burst():
+        # As in the bot: the persistence writer is running, so each forge only marks the list dirty.
+        async def burst():
+            list_bot.start_persistence_writer()
+            for item, name in forges:
+                list_bot.update_data_for_auto(item, name)
+            list_bot.persistence_task.cancel()
+        asyncio.run(burst())
+        list_bot.persistence_task = None
+
+    stages.append(("update_data_for_auto", SUITE_FORGES, forge_burst))
+    stages.append(("save_data_list", 1, list_bot.save_data_list))
+    stages.append(("snapshot", 1, lambda: list_bot._write_snapshot(list_bot._snapshot_payload())))
+    return stages
+
+
+def _run_pipeline(n: int, trace_memory: bool) -> list:
+    """Runs every stage once on a fresh synthetic data.json of n rows."""
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as data_dir:
+        os.chdir(data_dir)
+        try:
+            rows = [[r[0], r[1], r[2], int(r[3])] for r in make_rows(n)]
+            with open(list_bot.DATA_FILE, "w") as f:
+                json.dump({"list_data": rows, "state_data": {"channel_list_states": {}}}, f, indent=4)
+            del rows
+            list_bot.list_store = list_bot.ListStore()
+            list_bot.list_loaded = False
+            list_bot.sqlite_storage = list_bot.SqliteStorage(list_bot.SQLITE_FILE)
+            list_bot._list_pages_cache = {}
+            for stage, ops, fn in _pipeline_stages(n):
+                if trace_memory:
+                    tracemalloc.start()
+                    base = tracemalloc.get_traced_memory()[0]
+                    fn()
+                    results.append({"rows": n, "stage": stage, "peak_bytes": tracemalloc.get_traced_memory()[1] - base})
+                    tracemalloc.stop()
+                else:
+                    begin = time.perf_counter()
+                    fn()
+                    elapsed = time.perf_counter() - begin
+                    results.append({"rows": n, "stage": stage, "ops": ops, "seconds": elapsed,
+                                    "seconds_per_op": elapsed / ops})
+            results.append({"rows": n, "stage": "data_file", "bytes": os.path.getsize(list_bot.DATA_FILE)})
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes=SUITE_SIZES, trace_memory: bool = True) -> dict:
+    """Times (and optionally memory-profiles) the pipeline at every size. Returns the JSON report."""
+    report = {
+        "bot_version": list_bot.VERSION,
+        "commit": _git_commit(),
+        "persistence_mode": list_bot.PERSISTENCE_MODE,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": int(time.time()),
+        "results": [],
+    }
+    for n in sizes:
+        timings = _run_pipeline(n, trace_memory=False)
+        peaks = {}
+        if trace_memory:
+            peaks = {r["stage"]: r["peak_bytes"] for r in _run_pipeline(n, trace_memory=True) if "peak_bytes" in r}
+        for result in timings:
+            if result["stage"] in peaks:
+                result["peak_bytes"] = peaks[result["stage"]]
+            report["results"].append(result)
+        print(f"{n:,} rows done", file=sys.stderr)
+    return report
+
+
+def print_suite(report: dict, baseline: dict = None):
+    """Table of the report; with a baseline report, also the time ratio per stage (>1 is slower)."""
+    before = {(r["rows"], r["stage"]): r for r in baseline["results"]} if baseline else {}
+    print(f"{'rows':>9} {'stage':<44} {'ms/op':>11} {'peak MB':>9}" + (f" {'vs base':>8}" if baseline else ""))
+    for r in report["results"]:
+        if "seconds" not in r:
+            continue
+        peak = f"{r['peak_bytes'] / 2**20:>9.2f}" if "peak_bytes" in r else f"{'-':>9}"
+        line = f"{r['rows']:>9} {r['stage']:<44} {r['seconds_per_op'] * 1000:>11.3f} {peak}"
+        old = before.get((r["rows"], r["stage"]))
+        if baseline:
+            line += f" {r['seconds'] / old['seconds']:>7.2f}x" if old and old.get("seconds") else f" {'-':>8}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the unique list.")
+    sub = parser.add_subparsers(dest="command")
+    suite_args = sub.add_parser("suite", help="Time every pipeline stage and write the results as JSON.")
+    suite_args.add_argument("--sizes", default=",".join(map(str, SUITE_SIZES)),
+                            help="Comma-separated list sizes (default: %(default)s).")
+    suite_args.add_argument("--output", help="Write the JSON report to this file.")
+    suite_args.add_argument("--baseline", help="A previous JSON report to compare against.")
+    suite_args.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass.")
+    args = parser.parse_args()
+
+    if args.command == "suite":
+        report = run_suite([int(size) for size in args.sizes.split(",")], trace_memory=not args.no_memory)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        baseline = None
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        print_suite(report, baseline)
+    else:
+        bench_forge()
+        bench_views()
+        bench_recent()
+        bench_row_types()
+        bench_autocomplete()
+        bench_click_storm()
+        bench_refresh_fanout()
+        bench_on_message()
@@ -0,0 +1,516 @@
+"""Local stand-in for the Discord REST API and gateway, for end-to-end forge latency runs.
+
+Serves the REST routes and the gateway websocket the bot uses on 127.0.0.1, points
+discord.py at it and runs list_bot unmodified: login, READY/GUILD_CREATE, the startup
+command sync and list sync, then a storm of forge-bot MESSAGE_CREATE events. It measures how
+long each forge takes to show up in every persistent list channel and in every notification
+channel, plus how many API calls each forge costs. Every REST call gets simulated latency,
+and each channel/method pair has a Discord-style rate-limit bucket (X-RateLimit headers, 429
+with retry_after once it is exhausted), so discord.py's own rate limiter and
+list_bot.rest_pacer see what they would see in production.
+
+The run fails (exit status 1) if a forge never reaches every channel or a list channel is
+left with messages the bot no longer tracks.
+
+Usage: python fake_discord.py [--forges 200] [--rate 20] [--rows 2000] [--latency 0.08] [--json out.json]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import aiohttp
+import aiohttp.web
+import discord
+import yarl
+
+import list_bot
+from benchmarks import make_rows
+
+GUILD_ID = 1355000000000000000
+BOT_USER_ID = 1390000000000000001
+FORGE_CHANNEL_ID = 1379160458698690000
+HEARTBEAT_INTERVAL_MS = 41250
+
+
+def user_payload(user_id: int, username: str) -> dict:
+    return {"id": str(user_id), "username": username, "discriminator": "0", "global_name": None,
+            "avatar": None, "bot": True, "flags": 0, "public_flags": 0}
+
+
+class FakeDiscord:
+    """The REST side and the gateway: latency, per-(channel, method) buckets, 429s, call
+    counting, and the messages every channel holds."""
+
+    def __init__(self, latency: float = 0.08, jitter: float = 0.04, bucket_size: int = 5,
+                 bucket_window: float = 5.0, error_rate: float = 0.0, seed: int = 1):
+        self.latency = latency
+        self.jitter = jitter
+        self.bucket_size = bucket_size
+        self.bucket_window = bucket_window
+        self.error_rate = error_rate
+        self.rnd = random.Random(seed)
+        self.buckets = {}
+        self.calls = Counter()
+        self.rate_limited = 0
+        self.surfaced_errors = 0
+        self.unhandled_routes = Counter()
+        # channel_id -> {message_id: content} for the messages that exist right now.
+        self.messages = {}
+        self.on_write = lambda channel_id, content, notification: None
+        self.channel_ids = set()
+        self.role_ids = set()
+        self.url = None
+        self._ids = itertools.count(1400000000000000000)
+        self._runner = None
+        self._sockets = set()
+        self._seq = itertools.count(1)
+
+    def reset_counters(self):
+        self.calls.clear()
+        self.rate_limited = 0
+        self.surfaced_errors = 0
+
+    # --- server ---
+
+    async def start(self):
+        app = aiohttp.web.Application()
+        app.router.add_get("/gateway", self.gateway)
+        api = "/api/v10"
+        app.router.add_get(api + "/users/@me", lambda r: self._ok(user_payload(BOT_USER_ID, "List Bot")))
+        app.router.add_get(api + "/oauth2/applications/@me", self.application_info)
+        app.router.add_get(api + "/channels/{channel_id}", self.get_channel)
+        app.router.add_post(api + "/channels/{channel_id}/messages", self.create_message)
+        app.router.add_patch(api + "/channels/{channel_id}/messages/{message_id}", self.edit_message)
+        app.router.add_delete(api + "/channels/{channel_id}/messages/{message_id}", self.delete_message)
+        app.router.add_put(api + "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me",
+                           self.add_reaction)
+        app.router.add_put(api + "/applications/{application_id}/commands", lambda r: self._ok([]))
+        app.router.add_route("*", api + "/{tail:.*}", self.unhandled)
+        self._runner = aiohttp.web.AppRunner(app)
+        await self._runner.setup()
+        site = aiohttp.web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+
+    async def close(self):
+        for ws in list(self._sockets):
+            await ws.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    def install(self):
+        """Points discord.py at this server instead of discord.com."""
+        discord.http.Route.BASE = self.url + "/api/v10"
+        discord.gateway.DiscordWebSocket.DEFAULT_GATEWAY = yarl.URL(self.url.replace("http", "ws", 1) + "/gateway")
+
+    @staticmethod
+    def _ok(data, status: int = 200, headers=None):
+        if data is None:
+            return aiohttp.web.Response(status=204, headers=headers)
+        # discord.py only decodes bodies labelled exactly application/json (no charset).
+        headers = {**(headers or {}), "Content-Type": "application/json"}
+        return aiohttp.web.Response(body=json.dumps(data).encode(), status=status, headers=headers)
+
+    async def unhandled(self, request):
+        self.unhandled_routes[f"{request.method} {request.match_info['tail']}"] += 1
+        return self._ok({"message": "404: Not Found", "code": 0}, status=404)
+
+    async def application_info(self, request):
+        return self._ok({
+            "id": str(BOT_USER_ID), "name": "List Bot", "description": "", "icon": None,
+            "bot_public": True, "bot_require_code_grant": False, "verify_key": "0" * 64, "flags": 0,
+            "owner": user_payload(list_bot.YOUR_USER_ID, "owner"),
+        })
+
+    async def _call(self, request, method: str, handler):
+        """One rate-limited API call on a channel: 429 while the bucket is empty, otherwise
+        the handler's answer (or a 503 for error_rate of the calls) after the latency."""
+        channel_id = int(request.match_info["channel_id"])
+        self.calls[method] += 1
+        now = time.monotonic()
+        remaining, reset_at = self.buckets.get((channel_id, method), (self.bucket_size, now))
+        if now >= reset_at:
+            remaining, reset_at = self.bucket_size, now + self.bucket_window
+        if remaining > 0:
+            self.buckets[(channel_id, method)] = (remaining - 1, reset_at)
+        await asyncio.sleep(max(0.0, self.rnd.gauss(self.latency, self.jitter)))
+        now = time.monotonic()
+        headers = {
+            "X-RateLimit-Limit": str(self.bucket_size),
+            "X-RateLimit-Reset": f"{time.time() + max(0.0, reset_at - now):.3f}",
+            "X-RateLimit-Reset-After": f"{max(0.0, reset_at - now):.3f}",
+            "X-RateLimit-Bucket": f"{method.lower()}-channel-messages",
+        }
+        if remaining <= 0:
+            self.rate_limited += 1
+            headers.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Scope": "user",
+                            "Retry-After": str(int(max(0.0, reset_at - now)) + 1), "Via": "1.1 google"})
+            return self._ok({"message": "You are being rate limited.", "retry_after": round(max(0.0, reset_at - now), 3),
+                             "global": False}, status=429, headers=headers)
+        headers["X-RateLimit-Remaining"] = str(remaining - 1)
+        if self.error_rate and self.rnd.random() < self.error_rate:
+            # 500/502/504 are retried inside discord.py; a 503 reaches the bot.
+            self.surfaced_errors += 1
+            return self._ok({"message": "Service Unavailable", "code": 0}, status=503, headers=headers)
+        data, status = await handler(channel_id)
+        return self._ok(data, status=status, headers=headers)
+
+    # --- REST routes ---
+
+    async def get_channel(self, request):
+        channel_id = int(request.match_info["channel_id"])
+        if channel_id not in self.channel_ids:
+            return self._ok({"message": "Unknown Channel", "code": 10003}, status=404)
+        return self._ok(self.channel_payload(channel_id))
+
+    async def create_message(self, request):
+        payload = await request.json()
+
+        async def handler(channel_id):
+            message_id = next(self._ids)
+            content = payload.get("content") or ""
+            self.messages.setdefault(channel_id, {})[message_id] = content
+            # Notifications are the only sends that carry allowed_mentions.
+            self.on_write(channel_id, content, "allowed_mentions" in payload)
+            return self.message_payload(channel_id, message_id, content, payload.get("components")), 200
+        return await self._call(request, "POST", handler)
+
+    async def edit_message(self, request):
+        payload = await request.json()
+        message_id = int(request.match_info["message_id"])
+
+        async def handler(channel_id):
+            messages = self.messages.get(channel_id, {})
+            if message_id not in messages:
+                return {"message": "Unknown Message", "code": 10008}, 404
+            content = payload.get("content", messages[message_id]) or ""
+            messages[message_id] = content
+            self.on_write(channel_id, content, False)
+            return self.message_payload(channel_id, message_id, content, payload.get("components")), 200
+        return await self._call(request, "PATCH", handler)
+
+    async def delete_message(self, request):
+        message_id = int(request.match_info["message_id"])
+
+        async def handler(channel_id):
+            if self.messages.get(channel_id, {}).pop(message_id, None) is None:
+                return {"message": "Unknown Message", "code": 10008}, 404
+            return None, 204
+        return await self._call(request, "DELETE", handler)
+
+    async def add_reaction(self, request):
+        async def handler(channel_id):
+            return None, 204
+        return await self._call(request, "PUT", handler)
+
+    # --- payloads ---
+
+    def channel_payload(self, channel_id: int) -> dict:
+        return {"id": str(channel_id), "type": 0, "guild_id": str(GUILD_ID), "name": f"channel-{channel_id}",
+                "position": 0, "permission_overwrites": [], "nsfw": False, "parent_id": None,
+                "topic": None, "last_message_id": None, "rate_limit_per_user": 0}
+
+    def message_payload(self, channel_id: int, message_id: int, content: str, components=None,
+                        author=None) -> dict:
+        return {
+            "id": str(message_id), "channel_id": str(channel_id), "guild_id": str(GUILD_ID),
+            "author": author or user_payload(BOT_USER_ID, "List Bot"), "content": content,
+            "timestamp": discord.utils.utcnow().isoformat(), "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [],
+            "embeds": [], "pinned": False, "type": 0, "flags": 0, "components": components or [],
+        }
+
+    def guild_payload(self) -> dict:
+        roles = [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0}]
+        roles += [{"id": str(role_id), "name": f"role-{role_id}", "permissions": "0", "position": 1,
+                   "mentionable": True} for role_id in sorted(self.role_ids)]
+        for role in roles:
+            role.update(color=0, hoist=False, managed=False, flags=0)
+            role.setdefault("mentionable", False)
+        bot_member = {"user": user_payload(BOT_USER_ID, "List Bot"), "roles": [], "deaf": False, "mute": False,
+                      "joined_at": discord.utils.utcnow().isoformat(), "flags": 0}
+        return {
+            "id": str(GUILD_ID), "name": "Fake Guild", "icon": None, "owner_id": str(list_bot.YOUR_USER_ID),
+            "roles": roles, "emojis": [], "stickers": [], "features": [], "unavailable": False, "large": False,
+            "member_count": 1, "members": [bot_member], "channels": [self.channel_payload(cid) for cid in
+                                                                    sorted(self.channel_ids)],
+            "threads": [], "voice_states": [], "presences": [], "stage_instances": [],
+            "guild_scheduled_events": [], "mfa_level": 0, "verification_level": 0, "explicit_content_filter": 0,
+            "default_message_notifications": 0, "system_channel_flags": 0, "premium_tier": 0,
+            "preferred_locale": "en-US", "nsfw_level": 0, "afk_timeout": 300,
+        }
+
+    # --- gateway ---
+
+    async def gateway(self, request):
+        ws = aiohttp.web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_json({"op": 10, "d": {"heartbeat_interval": HEARTBEAT_INTERVAL_MS}, "s": None, "t": None})
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                continue
+            payload = json.loads(msg.data)
+            op = payload.get("op")
+            if op == 1:
+                await ws.send_json({"op": 11, "d": None, "s": None, "t": None})
+            elif op == 2:
+                self._sockets.add(ws)
+                await self._send_event(ws, "READY", {
+                    "v": 10, "user": user_payload(BOT_USER_ID, "List Bot"), "session_id": "fake-session",
+                    "resume_gateway_url": self.url.replace("http", "ws", 1) + "/gateway",
+                    "guilds": [{"id": str(GUILD_ID), "unavailable": True}],
+                    "application": {"id": str(BOT_USER_ID), "flags": 0},
+                })
+                await self._send_event(ws, "GUILD_CREATE", self.guild_payload())
+            elif op == 6:
+                # No resumes: make the client identify again.
+                await ws.send_json({"op": 9, "d": False, "s": None, "t": None})
+            elif op == 8:
+                data = payload["d"]
+                await self._send_event(ws, "GUILD_MEMBERS_CHUNK", {
+                    "guild_id": data["guild_id"], "members": [], "chunk_index": 0, "chunk_count": 1,
+                    "nonce": data.get("nonce"),
+                })
+        self._sockets.discard(ws)
+        return ws
+
+    async def _send_event(self, ws, event: str, data: dict):
+        await ws.send_json({"op": 0, "t": event, "s": next(self._seq), "d": data})
+
+    async def post_as(self, channel_id: int, author: dict, content: str):
+        """A message someone else posted, delivered over the gateway as MESSAGE_CREATE."""
+        message_id = next(self._ids)
+        self.messages.setdefault(channel_id, {})[message_id] = content
+        for ws in list(self._sockets):
+            await self._send_event(ws, "MESSAGE_CREATE", self.message_payload(channel_id, message_id, content,
+                                                                               author=author))
+
+
+class ForgeTracker:
+    """Matches list writes and notifications back to the forges they make visible."""
+
+    def __init__(self, list_channel_ids, notify_channel_ids):
+        self.list_channel_ids = set(list_channel_ids)
+        self.notify_channel_ids = set(notify_channel_ids)
+        self.forges = []
+
+    def forged(self, item: str, cost: int):
+        forge = {"item": item, "cost": cost, "at": time.monotonic(), "list": {}, "notify": {}}
+        self.forges.append(forge)
+
+    def on_write(self, channel_id: int, content: str, notification: bool):
+        now = time.monotonic()
+        if notification:
+            for forge in self.forges:
+                if channel_id not in forge["notify"] and forge["item"] in content:
+                    forge["notify"][channel_id] = now
+                    break
+            return
+        if channel_id not in self.list_channel_ids or not content:
+            return
+        # Default list sort is by item: every line starts with the item and ends with its cost.
+        costs = {}
+        for line in content.splitlines():
+            fields = line.split()
+            if fields and fields[-1].isdigit():
+                costs[line] = int(fields[-1])
+        for forge in self.forges:
+            if channel_id in forge["list"]:
+                continue
+            for line, cost in costs.items():
+                if line.startswith(forge["item"] + " ") and cost >= forge["cost"]:
+                    forge["list"][channel_id] = now
+                    break
+
+    def latencies(self):
+        """(list, notify, end_to_end) seconds per forge that fully landed; forges still missing
+        a channel are counted separately."""
+        lists, notifies, totals, incomplete = [], [], [], 0
+        for forge in self.forges:
+            if len(forge["list"]) < len(self.list_channel_ids) or len(forge["notify"]) < len(self.notify_channel_ids):
+                incomplete += 1
+                continue
+            list_done = max(forge["list"].values()) - forge["at"]
+            notify_done = max(forge["notify"].values()) - forge["at"]
+            lists.append(list_done)
+            notifies.append(notify_done)
+            totals.append(max(list_done, notify_done))
+        return lists, notifies, totals, incomplete
+
+
+def orphaned_messages(server: FakeDiscord, list_channel_ids) -> int:
+    """Messages left in a list channel that the bot no longer tracks as a list part."""
+    orphans = 0
+    for cid in list_channel_ids:
+        tracked = set(list_bot.channel_list_states.get(cid, {}).get("message_ids", []))
+        orphans += len(set(server.messages.get(cid, {})) - tracked)
+    return orphans
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def _wait_for(condition, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(0.1)
+    return True
+
+
+async def run_storm(forges: int = 200, rate: float = 20.0, rows: int = 2000, server: FakeDiscord = None,
+                    drain_timeout: float = 180.0, seed: int = 2) -> dict:
+    """Runs the bot against the fake in a scratch directory, so data.json and friends are
+    written there instead of next to the real ones."""
+    server = server or FakeDiscord()
+    list_channel_ids = [cid for cid in list_bot.INTERACTIVE_LIST_TARGET_CHANNEL_IDS if cid]
+    notify_channel_ids = [cfg["channel_id"] for cfg in list_bot.UPDATE_NOTIFICATION_CONFIG if cfg.get("channel_id")]
+    tracker = ForgeTracker(list_channel_ids, notify_channel_ids)
+    server.on_write = tracker.on_write
+    server.channel_ids = set(list_channel_ids) | set(notify_channel_ids) | {FORGE_CHANNEL_ID, list_bot.VERSION_CHANNEL_ID}
+    server.role_ids = {cfg["role_id_to_ping"] for cfg in list_bot.UPDATE_NOTIFICATION_CONFIG if cfg.get("role_id_to_ping")}
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        os.chdir(scratch)
+        with open(list_bot.DATA_FILE, "w") as f:
+            json.dump({"list_data": make_rows(rows)}, f)
+        await server.start()
+        server.install()
+        list_bot.start_persistence_writer()
+        client_task = asyncio.create_task(list_bot.client.start("fake-token"))
+        try:
+            ready_task = asyncio.ensure_future(list_bot.client.wait_until_ready())
+            await asyncio.wait([ready_task, client_task], timeout=60, return_when=asyncio.FIRST_COMPLETED)
+            if client_task.done():
+                ready_task.cancel()
+                client_task.result()
+            if not ready_task.done():
+                ready_task.cancel()
+                raise RuntimeError("The bot never became ready.")
+            # Steady state first: the startup sync has put the list messages in place.
+            ready = await _wait_for(lambda: all(
+                list_bot.channel_list_states.get(cid, {}).get("content_hashes")
+                and None not in list_bot.channel_list_states[cid]["content_hashes"]
+                and not list_bot.channel_list_states[cid].get("incomplete")
+                for cid in list_channel_ids), 180)
+            if not ready:
+                raise RuntimeError("The startup list sync never completed.")
+            await asyncio.sleep(list_bot.REFRESH_DEBOUNCE_SECONDS * 2)
+            server.reset_counters()
+            list_sync_calls = list_bot.list_sync_stats["api_calls"]
+            syncs = list_bot.list_refresh_scheduler.stats["syncs"]
+            retries = list_bot.list_refresh_scheduler.stats["retries"]
+
+            rnd = random.Random(seed)
+            costs = {row.item: row.cost for row in list_bot.list_store}
+            items = list(costs)
+            author = user_payload(list_bot.TARGET_BOT_ID_FOR_AUTO_UPDATES, "Forge Bot")
+            start = time.monotonic()
+            for i in range(forges):
+                await asyncio.sleep(max(0.0, start + i / rate - time.monotonic()))
+                item = rnd.choice(items)
+                costs[item] += 1
+                tracker.forged(item, costs[item])
+                await server.post_as(FORGE_CHANNEL_ID, author,
+                                     f"The Unique {item} has been forged by Player{rnd.randrange(300)}!")
+
+            await _wait_for(lambda: tracker.latencies()[3] == 0
+                            and orphaned_messages(server, list_channel_ids) == 0, drain_timeout)
+            await asyncio.gather(*list_bot._background_tasks, return_exceptions=True)
+        finally:
+            await list_bot.client.close()
+            await asyncio.gather(client_task, return_exceptions=True)
+            await list_bot.flush_saves()
+            list_bot.persistence_task.cancel()
+            await server.close()
+            os.chdir(cwd)
+
+    lists, notifies, totals, incomplete = tracker.latencies()
+    total_calls = sum(server.calls.values())
+    return {
+        "forges": forges,
+        "rate_per_second": rate,
+        "rows": rows,
+        "list_channels": len(list_channel_ids),
+        "notification_channels": len(notify_channel_ids),
+        "latency": server.latency,
+        "incomplete_forges": incomplete,
+        "orphaned_list_messages": orphaned_messages(server, list_channel_ids),
+        "end_to_end_p50": percentile(totals, 0.50),
+        "end_to_end_p99": percentile(totals, 0.99),
+        "list_p50": percentile(lists, 0.50),
+        "list_p99": percentile(lists, 0.99),
+        "notify_p50": percentile(notifies, 0.50),
+        "notify_p99": percentile(notifies, 0.99),
+        "api_calls": total_calls,
+        "api_calls_per_forge": total_calls / forges,
+        "api_calls_by_method": dict(server.calls),
+        "list_sync_api_calls": list_bot.list_sync_stats["api_calls"] - list_sync_calls,
+        "rate_limited_429": server.rate_limited,
+        "surfaced_errors": server.surfaced_errors,
+        "list_syncs": list_bot.list_refresh_scheduler.stats["syncs"] - syncs,
+        "list_sync_retries": list_bot.list_refresh_scheduler.stats["retries"] - retries,
+        "notification_retries": list_bot.notification_dispatcher.stats["retries"],
+        "paced_seconds": list_bot.rest_pacer.stats["paced_seconds"],
+        "unhandled_routes": dict(server.unhandled_routes),
+    }
+
+
+def print_report(report: dict):
+    print(f"{report['forges']} forges at {report['rate_per_second']}/s on {report['rows']} rows, "
+          f"{report['list_channels']} list + {report['notification_channels']} notification channels, "
+          f"{report['latency'] * 1000:.0f} ms per call")
+    print(f"  end-to-end  p50 {report['end_to_end_p50']:.2f}s  p99 {report['end_to_end_p99']:.2f}s")
+    print(f"  list edit   p50 {report['list_p50']:.2f}s  p99 {report['list_p99']:.2f}s")
+    print(f"  notify      p50 {report['notify_p50']:.2f}s  p99 {report['notify_p99']:.2f}s")
+    print(f"  API calls   {report['api_calls']} ({report['api_calls_per_forge']:.2f} per forge) "
+          f"{report['api_calls_by_method']}, {report['rate_limited_429']} answered 429, "
+          f"{report['surfaced_errors']} answered 503")
+    print(f"  list syncs  {report['list_syncs']} ({report['list_sync_retries']} retries after a failure), "
+          f"{report['notification_retries']} notification retries")
+    if report["unhandled_routes"]:
+        print(f"  routes the fake does not serve: {report['unhandled_routes']}")
+    if report["incomplete_forges"]:
+        print(f"  FAIL: {report['incomplete_forges']} forges never reached every channel")
+    if report["orphaned_list_messages"]:
+        print(f"  FAIL: {report['orphaned_list_messages']} list messages left behind untracked")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--forges", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=20.0, help="Forge messages per second.")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows in the list before the storm.")
+    parser.add_argument("--latency", type=float, default=0.08, help="Mean seconds per API call.")
+    parser.add_argument("--jitter", type=float, default=0.04)
+    parser.add_argument("--bucket-size", type=int, default=5, help="Requests per bucket window.")
+    parser.add_argument("--bucket-window", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Share of channel calls answered 503, which discord.py hands to the bot.")
+    parser.add_argument("--drain-timeout", type=float, default=180.0,
+                        help="Seconds to wait after the storm for every forge to land.")
+    parser.add_argument("--json", help="Write the report to this file.")
+    args = parser.parse_args()
+
+    server = FakeDiscord(args.latency, args.jitter, args.bucket_size, args.bucket_window, args.error_rate)
+    report = asyncio.run(run_storm(args.forges, args.rate, args.rows, server, args.drain_timeout))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if report["incomplete_forges"] or report["orphaned_list_messages"]:
+        sys.exit(1)
@@ -1,6 +1,5 @@
-from ast import Not
 import os
-from random import random
+import random
 import discord
 from discord import app_commands
 from discord.ext import commands 
@@ -12,17 +11,51 @@ import signal
 import atexit
 import traceback
 import sys
+import threading
+import sqlite3
+import bisect
+import math
+import operator
+import hashlib
+import hmac
+import contextlib
+import contextvars
+import functools
+import io
+import cProfile
+import pstats
 from discord.ui import View, Button, button
 from discord.enums import ButtonStyle
 from collections import Counter
 import aiohttp.web
-from collections import defaultdict
+from collections import defaultdict, deque
 
 # --- CONFIGURATION ---
 BOT_TOKEN = os.environ.get("BOT_TOKEN")
 DATA_FILE = "data.json"
+# "journal" appends one record per change to JOURNAL_FILE and folds it into DATA_FILE
+# every JOURNAL_COMPACT_RECORDS records; "json" rewrites DATA_FILE on every save;
+# "sqlite" keeps the list in SQLITE_FILE (migrated from DATA_FILE on first start).
+PERSISTENCE_MODE = os.environ.get("PERSISTENCE_MODE", "journal")
+JOURNAL_FILE = DATA_FILE + ".journal"
+JOURNAL_COMPACT_RECORDS = 500
 STATE_FILE = "bot_state.json"
-BASE_URL = "https://api.n.m28.io/endpoint/florrio-map-{}-green/findEach/"
+# Required as ?token= (or a Bearer header) by the /debug/ routes; without it they answer 404.
+DEBUG_TOKEN = os.environ.get("DEBUG_TOKEN")
+# Overridable so /list server_codes can be pointed at a local fake of the findEach endpoint.
+BASE_URL = os.environ.get("SERVER_CODES_BASE_URL", "https://api.n.m28.io/endpoint/florrio-map-{}-green/findEach/")
+SERVER_CODES_TTL = 30
+SERVER_CODES_STALE_TTL = 300
+# Seconds between background refreshes of all maps. Off (0) by default: polling costs one
+# upstream call per map per interval even when nobody asks for codes. When enabled, keep it
+# below SERVER_CODES_TTL (e.g. 20) so /list server_codes always answers from memory.
+SERVER_CODES_POLL_INTERVAL = float(os.environ.get("SERVER_CODES_POLL_INTERVAL", 0))
+SERVER_CODE_MAP_NAMES = ["Garden", "Desert", "Ocean", "Jungle", "Ant Hell", "Hel", "Sewers", "Factory", "Pyramid", "Ant hell"]
+REGION_LABELS = {
+    "miami": "🇺🇸 US",
+    "frankfurt": "🇪🇺 EU",
+    "tokyo": "🌏 AS",
+}
 
 TARGET_BOT_ID_FOR_AUTO_UPDATES = 1379160458698690691
 YOUR_USER_ID = 1453329316833398819
@@ -76,7 +109,7 @@ next_rarity_colors = {
 }
 
 # GLOBAL VARIABLES FOR PERSISTENT DATA
-data_list = []
+# The item list itself lives in `list_store` (see LIST STORE below).
 channel_list_states = {}
 DEFAULT_PERSISTENT_SORT_KEY = "sort_config_item"
 
@@ -90,13 +123,318 @@ def expected_successes(petals: int, chance: float) -> float:
         return 0.0
     return (petals - 2.5 * (1 - chance)) / ((2.5 / chance) + 2.5)
 
+# --- METRICS ---
+# Counters, gauges and histograms served by web_server() at /metrics in the Prometheus
+# text format. Saves observe from the persistence writer's thread, hence the lock.
+
+METRIC_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LOOP_LAG_INTERVAL = 0.5  # seconds between event-loop lag samples
+_metrics_lock = threading.Lock()
+metrics_registry = []
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _metric_labels(names: tuple, values: tuple, le: str = None) -> str:
+    pairs = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    """One metric family; samples are kept per tuple of label values.
+
+    kind is "counter", "gauge" or "histogram". A histogram sample is
+    [per-bucket counts, sum, count]; the buckets are made cumulative on render.
+    """
+
+    def __init__(self, name: str, kind: str, help_text: str, labels: tuple = (), buckets: tuple = METRIC_BUCKETS):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self.samples = {}
+        metrics_registry.append(self)
+
+    def inc(self, *label_values, amount: float = 1):
+        with _metrics_lock:
+            self.samples[label_values] = self.samples.get(label_values, 0) + amount
+
+    def set(self, value: float, *label_values):
+        with _metrics_lock:
+            self.samples[label_values] = value
+
+    def observe(self, value: float, *label_values):
+        with _metrics_lock:
+            sample = self.samples.get(label_values)
+            if sample is None:
+                sample = self.samples[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            i = bisect.bisect_left(self.buckets, value)
+            if i < len(self.buckets):
+                sample[0][i] += 1
+            sample[1] += value
+            sample[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with _metrics_lock:
+            samples = sorted((key, [list(v[0]), v[1], v[2]] if self.kind == "histogram" else v)
+                             for key, v in self.samples.items())
+        for key, value in samples:
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{_metric_labels(self.labels, key)} {value}")
+                continue
+            counts, total, count = value
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_metric_labels(self.labels, key, bound)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_metric_labels(self.labels, key, '+Inf')} {count}")
+            lines.append(f"{self.name}_sum{_metric_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_metric_labels(self.labels, key)} {count}")
+        return lines
+
+
+command_seconds = Metric("listbot_command_seconds", "histogram",
+                         "Time to handle a slash command.", ("command", "status"))
+rest_requests_total = Metric("listbot_rest_requests_total", "counter",
+                             "Discord REST requests per route.", ("route",))
+rest_request_seconds = Metric("listbot_rest_request_seconds", "histogram",
+                              "Discord REST request latency per route.", ("route",))
+rest_rate_limited_total = Metric("listbot_rest_rate_limited_total", "counter",
+                                 "Discord REST responses with status 429 per route.", ("route",))
+save_seconds = Metric("listbot_save_seconds", "histogram",
+                      "Time to write one save to disk.", ("mode",))
+save_bytes_total = Metric("listbot_save_bytes_total", "counter",
+                          "Bytes written by saves.", ("mode",))
+render_seconds = Metric("listbot_render_seconds", "histogram",
+                        "Time to render a sort view.", ("sort_key",))
+list_rows_gauge = Metric("listbot_list_rows", "gauge", "Rows in the unique list.")
+list_owners_gauge = Metric("listbot_list_owners", "gauge", "Distinct owners in the unique list.")
+loop_lag_seconds = Metric("listbot_event_loop_lag_seconds", "histogram",
+                          f"How late the event loop wakes from a {LOOP_LAG_INTERVAL}s sleep.")
+loop_stalls_total = Metric("listbot_event_loop_stalls_total", "counter",
+                           "Times the event loop was blocked for longer than LOOP_STALL_THRESHOLD.")
+
+def render_metrics() -> str:
+    list_rows_gauge.set(len(list_store))
+    list_owners_gauge.set(list_store.owner_total())
+    lines = []
+    for metric in metrics_registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+# --- TRACING ---
+# A trace is a tree of timed spans for one slash command, button press, forge message,
+# list refresh or save. The current span lives in a context variable, so spans opened
+# by awaited code and by tasks started from it nest under it; outside a trace span()
+# does nothing. The last TRACE_BUFFER_SIZE traces are kept for /list traces.
+
+TRACE_BUFFER_SIZE = 100
+TRACE_MAX_SPANS = 200  # per trace; a backfill or import would otherwise grow one without bound
+trace_buffer = deque(maxlen=TRACE_BUFFER_SIZE)
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+class Span:
+    __slots__ = ("name", "attrs", "root", "started_at", "start", "duration", "children", "span_count", "dropped")
+
+    def __init__(self, name: str, attrs: dict, root=None):
+        self.name = name
+        self.attrs = attrs
+        self.root = root or self
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.children = []
+        self.span_count = 1
+        self.dropped = 0
+
+    def child(self, name: str, attrs: dict):
+        """Opens a span below this one, or returns None once the trace is full."""
+        root = self.root
+        if root.span_count >= TRACE_MAX_SPANS:
+            root.dropped += 1
+            return None
+        root.span_count += 1
+        span = Span(name, attrs, root)
+        self.children.append(span)
+        return span
+
+    def finish(self, **attrs):
+        self.duration = time.perf_counter() - self.start
+        self.attrs.update(attrs)
+
+    def to_json(self) -> dict:
+        data = {
+            "name": self.name,
+            "offset_ms": round((self.start - self.root.start) * 1000, 3),
+            "duration_ms": None if self.duration is None else round(self.duration * 1000, 3),
+            "attrs": self.attrs,
+            "children": [child.to_json() for child in self.children],
+        }
+        if self.root is self:
+            data["started_at"] = self.started_at
+            data["dropped_spans"] = self.dropped
+        return data
+
+def open_span(name: str, **attrs):
+    """Starts a child of the current span without making it current (None outside a trace)."""
+    parent = _current_span.get()
+    return parent.child(name, attrs) if parent is not None else None
+
+@contextlib.contextmanager
+def _enter_span(span: Span):
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        span.finish()
+        _current_span.reset(token)
+
+@contextlib.contextmanager
+def span(name: str, parent: Span = None, **attrs):
+    """Times the block as a child of `parent` (default: the current span)."""
+    parent = parent or _current_span.get()
+    child = parent.child(name, attrs) if parent is not None else None
+    if child is None:
+        yield None
+        return
+    with _enter_span(child):
+        yield child
+
+@contextlib.contextmanager
+def trace(name: str, **attrs):
+    """Times the block as a new trace and keeps it in trace_buffer."""
+    root = Span(name, attrs)
+    trace_buffer.append(root)
+    with _enter_span(root):
+        yield root
+
+def start_trace(name: str, **attrs) -> Span:
+    """trace() for code that can't wrap a block: the caller must finish() the span."""
+    root = Span(name, attrs)
+    trace_buffer.append(root)
+    _current_span.set(root)
+    return root
+
+def traced(func):
+    """Runs a button callback inside a trace named after it."""
+    @functools.wraps(func)
+    async def wrapper(self, interaction: discord.Interaction, item):
+        with trace(f"button {func.__name__}", user=interaction.user.id):
+            return await func(self, interaction, item)
+    return wrapper
+
+def format_trace(root: Span) -> str:
+    def fmt(span: Span) -> str:
+        duration = "running" if span.duration is None else f"{span.duration * 1000:.1f}ms"
+        attrs = " ".join(f"{k}={v}" for k, v in span.attrs.items())
+        return f"{span.name} {duration} {attrs}".rstrip()
+
+    lines = [f"{time.strftime('%H:%M:%S', time.gmtime(root.started_at))} {fmt(root)}"]
+    def walk(span: Span, depth: int):
+        for child in span.children:
+            lines.append(f"{'  ' * depth}+{(child.start - root.start) * 1000:.1f}ms {fmt(child)}")
+            walk(child, depth + 1)
+    walk(root, 1)
+    if root.dropped:
+        lines.append(f"  ... {root.dropped} more spans dropped")
+    return "\n".join(lines)
+
+# --- DISCORD REST PACING ---
+# discord.py only waits once a rate-limit bucket is exhausted. This trace hook records
+# the X-RateLimit headers of every REST response, so the list sync can wait for a
+# bucket to reset instead of sleeping a fixed time between calls.
+
+class RestPacer:
+    def __init__(self):
+        # (channel_id, method) -> (remaining, reset_at on the monotonic clock)
+        self.buckets = {}
+        self.stats = {"requests": 0, "rate_limited": 0, "paced_seconds": 0.0}
+
+    @staticmethod
+    def route(method: str, path: str) -> str:
+        """Metrics label for a request: ids, tokens and emoji replaced by placeholders."""
+        path = re.sub(r"^/api/v\d+", "", path)
+        path = re.sub(r"/(webhooks|interactions)/\d+/[^/]+", r"/\1/{id}/{token}", path)
+        path = re.sub(r"/reactions/[^/]+", "/reactions/{emoji}", path)
+        path = re.sub(r"/\d+", "/{id}", path)
+        return f"{method.upper()} {path}"
+
+    async def _on_request_start(self, session, ctx, params):
+        ctx.started_at = time.perf_counter()
+        ctx.span = open_span(self.route(params.method, params.url.path))
+
+    async def _on_request_exception(self, session, ctx, params):
+        if ctx.span is not None:
+            ctx.span.finish(error=type(params.exception).__name__)
+
+    async def _on_request_end(self, session, ctx, params):
+        response = params.response
+        route = self.route(params.method, params.url.path)
+        if ctx.span is not None:
+            ctx.span.finish(status=response.status)
+        self.stats["requests"] += 1
+        rest_requests_total.inc(route)
+        rest_request_seconds.observe(time.perf_counter() - ctx.started_at, route)
+        if response.status == 429:
+            self.stats["rate_limited"] += 1
+            rest_rate_limited_total.inc(route)
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset_after = response.headers.get("X-RateLimit-Reset-After")
+        if remaining is None or reset_after is None:
+            return
+        match = re.search(r"/channels/(\d+)", params.url.path)
+        if match:
+            self.buckets[(int(match.group(1)), params.method.upper())] = (
+                int(remaining), time.monotonic() + float(reset_after)
+            )
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(self._on_request_start)
+        trace.on_request_exception.append(self._on_request_exception)
+        trace.on_request_end.append(self._on_request_end)
+        return trace
+
+    async def pace(self, channel_id: int, method: str):
+        """Waits until the channel's bucket for `method` has a request left."""
+        state = self.buckets.get((channel_id, method))
+        if not state:
+            return
+        remaining, reset_at = state
+        delay = reset_at - time.monotonic()
+        if remaining <= 0 and delay > 0:
+            self.stats["paced_seconds"] += delay
+            with span("pace", method=method):
+                await asyncio.sleep(delay)
+
+
+rest_pacer = RestPacer()
+
 # --- CLIENT SETUP ---
 intents = discord.Intents.default()
 intents.messages = True
 # intents.message_content = True # <-- REMOVED: This was causing the "unavailable scope" invite error.
 intents.guilds = True
 intents.members = True # KEEP THIS: This intent is required for slash command context and MUST be enabled in the Developer Portal.
-client = commands.Bot(command_prefix="!", intents=intents)
+
+class ListBotTree(app_commands.CommandTree):
+    """Starts the latency stamp and the trace of every slash command; see _finish_command."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.type is discord.InteractionType.application_command and interaction.command is not None:
+            interaction.extras["started_at"] = time.perf_counter()
+            interaction.extras["trace"] = start_trace(f"/{interaction.command.qualified_name}",
+                                                      user=interaction.user.id)
+        return True
+
+client = commands.Bot(command_prefix="!", intents=intents, http_trace=rest_pacer.trace_config(),
+                      tree_cls=ListBotTree)
 tree = client.tree
 
 # --- UTILITY FUNCTIONS ---
@@ -129,34 +467,41 @@ def sort_by_owner_tally(data):
     return sorted(data, key=custom_sort_key)
 
 
+# "sort_lambda" is the reference ordering over plain rows; the bot reads the same order
+# from the store's materialized "store_view" instead of re-sorting.
 SORT_CONFIGS = {
     "sort_config_item": {
         "label": "by Item", "button_label": "Sort: Item",
         "sort_lambda": lambda data: sorted(data, key=lambda x: (x[0].lower(), x[1].lower())),
-        "column_order_indices": [0, 1, 2], "headers": ["Item", "Name", "Cost"]
+        "column_order_indices": [0, 1, 2], "headers": ["Item", "Name", "Cost"],
+        "store_view": "item"
     },
     "sort_config_name": {
         "label": "by Name", "button_label": "Sort: Name",
         "sort_lambda": lambda data: sorted(data, key=lambda x: (x[1].lower(), x[0].lower())),
-        "column_order_indices": [1, 0, 2], "headers": ["Name", "Item", "Cost"]
+        "column_order_indices": [1, 0, 2], "headers": ["Name", "Item", "Cost"],
+        "store_view": "name"
     },
     "sort_config_cost": {
         "label": "by Cost", "button_label": "Sort: Cost",
         "sort_lambda": lambda data: sorted(data, key=lambda x: (int(x[2]) if str(x[2]).isdigit() else 0, x[0].lower())),
-        "column_order_indices": [2, 0, 1], "headers": ["Cost", "Item", "Name"]
+        "column_order_indices": [2, 0, 1], "headers": ["Cost", "Item", "Name"],
+        "store_view": "cost"
     },
     "sort_config_recent": {
         "label": "by Recent (Last 7 Days)", "button_label": "Sort: Recent",
-        "sort_lambda": lambda data: [
+        "sort_lambda": lambda data: sorted([
             row for row in data
-            if len(row) > 3 and row[3] >= (time.time() - SECONDS_IN_WEEK)
-        ][::-1],
-        "column_order_indices": [0, 1, 2], "headers": ["Item", "Name", "Cost (7 Days)"]
+            if row[3] >= (time.time() - SECONDS_IN_WEEK)
+        ][::-1], key=lambda x: x[3], reverse=True),
+        "column_order_indices": [0, 1, 2], "headers": ["Item", "Name", "Cost (7 Days)"],
+        "store_view": "recent"
     },
     "sort_config_owner": {
         "label": "by Owner Count", "button_label": "Sort: Owner",
         "sort_lambda": sort_by_owner_tally,
-        "column_order_indices": [1, 0, 2], "headers": ["Name", "Item", "Cost"]
+        "column_order_indices": [1, 0, 2], "headers": ["Name", "Item", "Cost"],
+        "store_view": "owner"
     }
 }
 
@@ -178,12 +523,390 @@ UPDATE_NOTIFICATION_CONFIG = [
     },
 ]
 
+# --- LIST STORE ---
+
+def _parse_cost(cost) -> int:
+    """Cost as stored in data.json ("3", 3, ...) to int; anything unparsable counts as 0."""
+    try:
+        return int(cost)
+    except (TypeError, ValueError):
+        return 0
+
+def _parse_timestamp(timestamp) -> float:
+    """Timestamp as stored in data.json (int, float, numeric string) to float; anything else counts as 0."""
+    try:
+        timestamp = float(timestamp or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return timestamp if math.isfinite(timestamp) else 0.0
+
+class ListRow:
+    """One list entry with typed fields: int cost, float timestamp, interned owner name.
+
+    On disk a row stays the [item, name, cost, timestamp] array data.json has always
+    held, cost as a string; from_json() and to_json() convert. Index access
+    (row[0] .. row[3]) and unpacking still work for code that treats rows as sequences.
+    """
+
+    __slots__ = ("item", "name", "cost", "timestamp")
+
+    def __init__(self, item: str, name: str, cost: int = 1, timestamp: float = 0.0):
+        self.item = item
+        self.name = sys.intern(name)
+        self.cost = cost
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_json(cls, row):
+        """Builds a row from a data.json/journal array; rows that are already ListRows pass through."""
+        if isinstance(row, ListRow):
+            return row
+        if len(row) == 4:
+            try:
+                return cls(row[0], row[1], int(row[2]), _parse_timestamp(row[3]))
+            except (TypeError, ValueError):
+                pass
+        cost = _parse_cost(row[2]) if len(row) > 2 else 0
+        timestamp = _parse_timestamp(row[3]) if len(row) > 3 else 0.0
+        return cls(str(row[0]), str(row[1]), cost, timestamp)
+
+    @classmethod
+    def from_json_rows(cls, rows) -> list:
+        """from_json over a whole list, as done on load.
+
+        Well-formed [item, name, cost, timestamp] arrays are built without the per-row
+        checks and __init__ call, which is most of what converting a large list costs;
+        anything else goes through from_json.
+        """
+        new = cls.__new__
+        intern = sys.intern
+        isfinite = math.isfinite
+        result = []
+        append = result.append
+        for row in rows:
+            if type(row) is list and len(row) == 4:
+                try:
+                    item, name, cost, timestamp = row
+                    cost, timestamp = int(cost), float(timestamp or 0)
+                    if isfinite(timestamp) and type(item) is str:
+                        built = new(cls)
+                        built.item, built.name, built.cost, built.timestamp = item, intern(name), cost, timestamp
+                        append(built)
+                        continue
+                except (TypeError, ValueError):
+                    pass
+            append(cls.from_json(row))
+        return result
+
+    def to_json(self) -> list:
+        timestamp = self.timestamp
+        # Whole-second timestamps (and legacy int ones) are written back as ints.
+        if isinstance(timestamp, float) and timestamp.is_integer():
+            timestamp = int(timestamp)
+        return [self.item, self.name, str(self.cost), timestamp]
+
+    def _fields(self) -> tuple:
+        return (self.item, self.name, self.cost, self.timestamp)
+
+    def __getitem__(self, index):
+        return getattr(self, ListRow.__slots__[index])
+
+    def __len__(self):
+        return 4
+
+    def __iter__(self):
+        return iter(self._fields())
+
+    def __eq__(self, other):
+        if isinstance(other, ListRow):
+            return self._fields() == other._fields()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ListRow({self.item!r}, {self.name!r}, {self.cost!r}, {self.timestamp!r})"
+
+class SortedView:
+    """One sort order, kept sorted with bisect.
+
+    Entries are the (unique) sort key followed by the row itself, so reading the
+    view needs no lookups and comparisons never reach the row.
+    """
+
+    def __init__(self, key_func):
+        self.key_func = key_func
+        self.keys = []
+
+    def rebuild(self, entries):
+        self.keys = sorted(entries)
+
+    def add(self, entry):
+        bisect.insort(self.keys, entry)
+
+    def remove(self, entry):
+        i = bisect.bisect_left(self.keys, entry)
+        if i < len(self.keys) and self.keys[i] == entry:
+            del self.keys[i]
+
+class ListStore:
+    """In-memory unique list of ListRows, keyed by the lowercased item name.
+
+    Rows passed in as data.json arrays are converted with ListRow.from_json. The dict keeps
+    insertion order, so "move the updated row to the end" is a pop and a
+    re-insert instead of a scan over the whole list.
+
+    The item/name/cost/owner orders of SORT_CONFIGS are materialized and kept
+    sorted on every mutation, so reading a view never sorts. Ties fall back to the
+    update sequence, which is what the stable sorts in the sort lambdas do. A
+    timestamp-ordered view serves "updated since" queries with a bisect.
+
+    Every mutation is also queued as a change record; save_data_list drains them
+    with pop_changes() to write the journal.
+    """
+
+    def __init__(self, rows=None):
+        self._rows = {}
+        self._changes = []
+        # Bumped on every mutation; render caches key on it.
+        self.version = 0
+        self._seq = {}
+        self._next_seq = 0
+        self._views = {
+            "item": SortedView(lambda key, row, seq: (key, row.name.lower(), row)),
+            "name": SortedView(lambda key, row, seq: (row.name.lower(), key, row)),
+            # Negative costs sort as 0, like the reference sort lambda and SQLite's cost_num.
+            "cost": SortedView(lambda key, row, seq: (max(row.cost, 0), key, row)),
+            "time": SortedView(lambda key, row, seq: (row.timestamp, seq, row)),
+        }
+        # Owner view: owners ordered by (-count, owner), each owner's rows by (-cost, seq).
+        self._owner_counts = {}
+        self._owner_order = []
+        self._owner_rows = {}
+        # Lowercased owner names in sorted order, for prefix lookups (items use the "item" view).
+        self._owner_names = []
+        if rows:
+            self.replace(rows)
+
+    @staticmethod
+    def _key(item: str) -> str:
+        return item.lower()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return iter(self._rows.values())
+
+    def __contains__(self, item):
+        return self._key(item) in self._rows
+
+    def rows(self) -> list:
+        """Returns the rows in update order (oldest first)."""
+        return list(self._rows.values())
+
+    def get(self, item: str):
+        return self._rows.get(self._key(item))
+
+    # -- view maintenance --
+
+    def _bump_seq(self, key: str):
+        self._next_seq += 1
+        self._seq[key] = self._next_seq
+
+    def _change_owner_count(self, owner: str, delta: int):
+        old = self._owner_counts.get(owner, 0)
+        if old:
+            i = bisect.bisect_left(self._owner_order, (-old, owner))
+            del self._owner_order[i]
+        new = old + delta
+        if new > 0:
+            self._owner_counts[owner] = new
+            bisect.insort(self._owner_order, (-new, owner))
+            if not old:
+                bisect.insort(self._owner_names, owner)
+        else:
+            self._owner_counts.pop(owner, None)
+            self._owner_rows.pop(owner, None)
+            if old:
+                del self._owner_names[bisect.bisect_left(self._owner_names, owner)]
+
+    def _index(self, key: str, row):
+        seq = self._seq[key]
+        for view in self._views.values():
+            view.add(view.key_func(key, row, seq))
+        owner = row.name.lower()
+        bisect.insort(self._owner_rows.setdefault(owner, []), (-row.cost, seq, row))
+        self._change_owner_count(owner, 1)
+
+    def _unindex(self, key: str, row):
+        seq = self._seq[key]
+        for view in self._views.values():
+            view.remove(view.key_func(key, row, seq))
+        owner = row.name.lower()
+        owner_rows = self._owner_rows.get(owner, [])
+        entry = (-row.cost, seq, row)
+        i = bisect.bisect_left(owner_rows, entry)
+        if i < len(owner_rows) and owner_rows[i] == entry:
+            del owner_rows[i]
+        self._change_owner_count(owner, -1)
+
+    def _rebuild_views(self):
+        for view in self._views.values():
+            view.rebuild(view.key_func(key, row, self._seq[key]) for key, row in self._rows.items())
+        self._owner_rows = {}
+        for key, row in self._rows.items():
+            self._owner_rows.setdefault(row.name.lower(), []).append((-row.cost, self._seq[key], row))
+        for entries in self._owner_rows.values():
+            entries.sort()
+        self._owner_counts = {owner: len(entries) for owner, entries in self._owner_rows.items()}
+        self._owner_order = sorted((-count, owner) for owner, count in self._owner_counts.items())
+        self._owner_names = sorted(self._owner_counts)
+
+    # -- views --
+
+    def sorted_rows(self, view: str) -> list:
+        """Rows in a materialized order: "item", "name", "cost", "owner" or "recent"."""
+        if view == "recent":
+            return self.recent_rows(time.time() - SECONDS_IN_WEEK)
+        if view == "owner":
+            return [row for _, owner in self._owner_order for _, _, row in self._owner_rows[owner]]
+        return [entry[-1] for entry in self._views[view].keys]
+
+    def owner_count(self, owner: str) -> int:
+        """How many items an owner holds (case-insensitive)."""
+        return self._owner_counts.get(owner.lower(), 0)
+
+    def owner_rows(self, owner: str) -> list:
+        """An owner's rows, highest cost first, as ordered in the Owner view."""
+        return [row for _, _, row in self._owner_rows.get(owner.lower(), [])]
+
+    def owner_rank(self, owner: str):
+        """1-based position of an owner in the Owner view, or None if they own nothing."""
+        count = self.owner_count(owner)
+        if not count:
+            return None
+        return bisect.bisect_left(self._owner_order, (-count, owner.lower())) + 1
+
+    def owner_total(self) -> int:
+        return len(self._owner_counts)
+
+    def complete_items(self, prefix: str, limit: int = 25) -> list:
+        """Up to `limit` item names starting with `prefix` (case-insensitive), alphabetically."""
+        prefix = prefix.lower()
+        keys = self._views["item"].keys
+        start = bisect.bisect_left(keys, (prefix,))
+        matches = []
+        for entry in keys[start:start + limit]:
+            if not entry[0].startswith(prefix):
+                break
+            matches.append(entry[-1].item)
+        return matches
+
+    def complete_owners(self, prefix: str, limit: int = 25) -> list:
+        """Up to `limit` owner names starting with `prefix` (case-insensitive), alphabetically."""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._owner_names, prefix)
+        matches = []
+        for owner in self._owner_names[start:start + limit]:
+            if not owner.startswith(prefix):
+                break
+            # Show the owner as spelled on their highest-cost row.
+            matches.append(self._owner_rows[owner][0][2].name)
+        return matches
+
+    def recent_rows(self, since: float) -> list:
+        """Rows updated at or after `since`, newest timestamp first."""
+        keys = self._views["time"].keys
+        start = bisect.bisect_left(keys, (since,))
+        return [entry[-1] for entry in reversed(keys[start:])]
+
+    # -- mutations --
+
+    def replace(self, rows):
+        """Replaces the whole list. For duplicate items the last row wins."""
+        self._rows = {}
+        self._seq = {}
+        for row in ListRow.from_json_rows(rows):
+            key = self._key(row.item)
+            self._rows.pop(key, None)
+            self._rows[key] = row
+            self._bump_seq(key)
+        self._rebuild_views()
+        self.version += 1
+        self._changes.append(("reset", None))
+
+    def put(self, row):
+        """Stores a full row as-is and moves it to the end of the update order."""
+        row = ListRow.from_json(row)
+        key = self._key(row.item)
+        old = self._rows.pop(key, None)
+        if old is not None:
+            self._unindex(key, old)
+        self._rows[key] = row
+        self._bump_seq(key)
+        self._index(key, row)
+        self.version += 1
+        self._changes.append(("put", row))
+
+    def upsert(self, item: str, name: str, cost=None, timestamp=None):
+        """Adds or updates an item and moves it to the end of the update order.
+
+        With cost=None an existing row's cost is incremented and a new row starts at 1.
+        Returns (row, created).
+        """
+        key = self._key(item)
+        timestamp = time.time() if timestamp is None else float(timestamp)
+        row = self._rows.pop(key, None)
+        created = row is None
+        if created:
+            row = ListRow(item, name, int(cost) if cost is not None else 1, timestamp)
+        else:
+            self._unindex(key, row)
+            row.name = sys.intern(name)
+            row.cost = row.cost + 1 if cost is None else int(cost)
+            row.timestamp = timestamp
+        self._rows[key] = row
+        self._bump_seq(key)
+        self._index(key, row)
+        self.version += 1
+        self._changes.append(("put", row))
+        return row, created
+
+    def delete(self, item: str):
+        """Removes an item. Returns the removed row, or None if it was not in the list."""
+        key = self._key(item)
+        row = self._rows.pop(key, None)
+        if row is not None:
+            self._unindex(key, row)
+            del self._seq[key]
+            self.version += 1
+            self._changes.append(("del", key))
+        return row
+
+    def pop_changes(self) -> list:
+        """Returns and clears the change records queued since the last call."""
+        changes, self._changes = self._changes, []
+        return changes
+
+    def requeue_changes(self, changes: list):
+        """Puts popped change records back in front of the queue, e.g. after a failed write."""
+        self._changes[:0] = changes
+
+
+list_store = ListStore()
+list_loaded = False
+# Compact JSON of channel_list_states as last written, so unchanged states are not rewritten.
+_saved_states_text = None
+
 # --- DATA PERSISTENCE FUNCTIONS ---
-def load_data_list():
-    """Loads item list data AND channel state data from the JSON file."""
-    global data_list
-    global channel_list_states
+def _read_data_file():
+    """Reads DATA_FILE in either layout (plain list or list_data/state_data dict).
 
+    Returns (rows, channel_list_states).
+    """
+    data_list = list(INITIAL_DATA_LIST)
+    states = {}
     if os.path.exists(DATA_FILE):
         try:
             with open(DATA_FILE, "r") as f:
@@ -193,47 +916,475 @@ def load_data_list():
                     data_list = loaded_data["list_data"]
                 elif isinstance(loaded_data, list):
                     data_list = loaded_data
-                else:
-                    data_list = list(INITIAL_DATA_LIST)
 
                 if isinstance(loaded_data, dict) and "state_data" in loaded_data and isinstance(loaded_data["state_data"], dict):
                     raw_states = loaded_data["state_data"].get("channel_list_states", {})
-                    channel_list_states = {int(k): v for k, v in raw_states.items() if str(k).isdigit()}
-                else:
-                    channel_list_states = {}
+                    states = {int(k): v for k, v in raw_states.items() if str(k).isdigit()}
 
         except (IOError, json.JSONDecodeError) as e:
             data_list = list(INITIAL_DATA_LIST)
-            channel_list_states = {}
-    else:
-        data_list = list(INITIAL_DATA_LIST)
-        channel_list_states = {}
+            states = {}
+    return data_list, states
 
-    for row in data_list:
-        if len(row) > 2:
-            row[2] = str(row[2])
-        if len(row) < 4:
-            row.append(0)
+def load_data_list():
+    """Loads item list data AND channel state data from the configured storage.
+
+    Only the first call loads: on a gateway reconnect the store already holds the list,
+    plus changes the persistence writer may not have flushed yet.
+    """
+    global channel_list_states, _saved_states_text, list_loaded
+    if list_loaded:
+        return
+
+    if PERSISTENCE_MODE == "sqlite":
+        data_list, channel_list_states = sqlite_storage.load()
+    else:
+        data_list, channel_list_states = _read_data_file()
+
+    # replace() turns the stored arrays into ListRows (int cost, missing timestamps as 0).
+    list_store.replace(data_list)
+
+    if PERSISTENCE_MODE == "journal" and os.path.exists(JOURNAL_FILE) and os.path.getsize(JOURNAL_FILE):
+        consumed = _replay_journal()
+        # Fold the replayed records into the snapshot so appends start on a clean file,
+        # even if the previous run died halfway through writing a record.
+        list_store.pop_changes()
+        if _write_snapshot(_snapshot_payload()):
+            _drop_journal_prefix(consumed)
+    list_store.pop_changes()
+    _saved_states_text = json.dumps(channel_list_states, separators=(",", ":"))
+    list_loaded = True
 
 def save_data_list():
-    """Saves item list data AND channel state data to the JSON file."""
-    global data_list
-    global channel_list_states
+    """Persists list changes AND channel state data right now (a durability point).
 
-    data_to_save = {
-        "list_data": data_list,
+    In journal mode only the changes since the last save are appended to JOURNAL_FILE;
+    otherwise the whole DATA_FILE is rewritten. Routine mutations should call
+    request_save() instead and let the persistence writer coalesce them.
+    """
+    if not list_loaded:
+        # Never overwrite the file with the empty list we have before on_ready loaded it.
+        return
+    if _flush_lock.locked():
+        # An async flush has popped a batch that may not be on disk yet; writing newer
+        # changes now could put them in front of it. That flush picks these up as well.
+        return
+    with span("save_data_list", mode=PERSISTENCE_MODE):
+        prepared = _prepare_save()
+        if prepared:
+            write, changes = prepared
+            if not write():
+                list_store.requeue_changes(changes)
+            elif journal_records_since_compaction >= JOURNAL_COMPACT_RECORDS:
+                _schedule_journal_compaction()
+
+def _prepare_save():
+    """Collects pending changes on the event loop.
+
+    Returns (write, changes), or None if there is nothing to write. write() runs the disk
+    write and returns False on failure; the caller then hands `changes` (the records popped
+    from the store) to list_store.requeue_changes so the next save writes them again.
+    Before load_data_list() has run the store is not the persisted list, so changes stay queued.
+    """
+    if not list_loaded:
+        return None
+    changes = list_store.pop_changes()
+    if PERSISTENCE_MODE == "journal":
+        records = [_journal_record(change) for change in changes]
+        states_text = json.dumps(channel_list_states, separators=(",", ":"))
+        if states_text != _saved_states_text:
+            records.append(f'["states",{states_text}]')
+        if not records:
+            return None
+        return (lambda: _append_journal(records, states_text)), changes
+    if PERSISTENCE_MODE == "sqlite":
+        ops = [_sqlite_op(change) for change in changes]
+        states_text = json.dumps(channel_list_states, separators=(",", ":"))
+        if not ops and states_text == _saved_states_text:
+            return None
+        return (lambda: sqlite_storage.apply(ops, states_text)), changes
+    payload = _snapshot_payload()
+    return (lambda: _write_snapshot(payload)), changes
+
+def _snapshot_payload() -> dict:
+    # Copies rows and states so the snapshot can be written while the list keeps changing.
+    return {
+        "list_data": [row.to_json() for row in list_store],
         "state_data": {
-            "channel_list_states": channel_list_states
+            "channel_list_states": json.loads(json.dumps(channel_list_states))
         }
     }
 
+def _write_snapshot(data_to_save: dict) -> bool:
+    started = time.perf_counter()
     try:
-        temp_data_file = DATA_FILE + ".tmp"
-        with open(temp_data_file, "w") as f:
-            json.dump(data_to_save, f, indent=4)
-        os.replace(temp_data_file, DATA_FILE)
+        with _persistence_lock:
+            temp_data_file = DATA_FILE + ".tmp"
+            with open(temp_data_file, "w") as f:
+                json.dump(data_to_save, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+                written = f.tell()
+            os.replace(temp_data_file, DATA_FILE)
+        persistence_stats["writes"] += 1
+        save_seconds.observe(time.perf_counter() - started, "snapshot")
+        save_bytes_total.inc("snapshot", amount=written)
+        return True
     except (IOError, TypeError) as e:
         print(f"ERROR: Failed to save data to {DATA_FILE}: {e}")
+        return False
+
+# --- JOURNAL PERSISTENCE ---
+# One compact JSON array per line: ["put", row], ["del", item_key], ["reset", rows]
+# or ["states", channel_list_states]. Every record carries the full new value, so
+# replaying a record that is already in the snapshot is harmless.
+
+journal_records_since_compaction = 0
+_persistence_lock = threading.RLock()
+
+def _journal_record(change) -> str:
+    op, value = change
+    if op == "reset":
+        value = [row.to_json() for row in list_store]
+    elif op == "put":
+        value = value.to_json()
+    return json.dumps([op, value], separators=(",", ":"))
+
+def _append_journal(records: list, states_text: str) -> bool:
+    global journal_records_since_compaction, _saved_states_text
+    started = time.perf_counter()
+    try:
+        with _persistence_lock:
+            # Binary, so the byte counter sees bytes (not characters) and replay reads what it expects.
+            with open(JOURNAL_FILE, "ab") as f:
+                written = f.write(("\n".join(records) + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+    except (IOError, TypeError) as e:
+        print(f"ERROR: Failed to append to {JOURNAL_FILE}: {e}")
+        return False
+    _saved_states_text = states_text
+    journal_records_since_compaction += len(records)
+    persistence_stats["writes"] += 1
+    save_seconds.observe(time.perf_counter() - started, "journal")
+    save_bytes_total.inc("journal", amount=written)
+    return True
+
+def _replay_journal() -> int:
+    """Applies JOURNAL_FILE on top of the loaded snapshot. Stops at the first torn record.
+
+    A torn record (the previous run died halfway through an append) is cut off the file
+    right away, so the next append can't run into it even if folding the journal into
+    the snapshot fails. Returns the byte offset up to which the journal was applied.
+    """
+    global channel_list_states
+    applied = 0
+    consumed = 0
+    torn = False
+    with open(JOURNAL_FILE, "rb") as f:
+        for line in f:
+            try:
+                op, value = json.loads(line)
+            except (ValueError, TypeError):
+                print(f"WARNING: Ignoring incomplete journal record after {applied} records.")
+                torn = True
+                break
+            consumed += len(line)
+            if op == "put":
+                list_store.put(value)
+            elif op == "del":
+                list_store.delete(value)
+            elif op == "reset":
+                list_store.replace(value)
+            elif op == "states":
+                channel_list_states = {int(k): v for k, v in value.items() if str(k).isdigit()}
+            applied += 1
+    print(f"Replayed {applied} journal records from {JOURNAL_FILE}.")
+    if torn or (consumed and not line.endswith(b"\n")):
+        consumed = _seal_journal(consumed)
+    return consumed
+
+def _seal_journal(offset: int) -> int:
+    """Truncates the journal to `offset` and makes sure it ends with a newline. Returns the new size."""
+    try:
+        with _persistence_lock:
+            with open(JOURNAL_FILE, "r+b") as f:
+                f.truncate(offset)
+                if offset:
+                    f.seek(offset - 1)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+                        offset += 1
+                f.flush()
+                os.fsync(f.fileno())
+    except IOError as e:
+        print(f"ERROR: Failed to repair {JOURNAL_FILE}: {e}")
+    return offset
+
+def _drop_journal_prefix(offset: int):
+    """Removes the first `offset` bytes (already folded into the snapshot) from the journal."""
+    global journal_records_since_compaction
+    try:
+        with _persistence_lock:
+            with open(JOURNAL_FILE, "rb") as f:
+                f.seek(offset)
+                tail = f.read()
+            tmp = JOURNAL_FILE + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, JOURNAL_FILE)
+        journal_records_since_compaction = tail.count(b"\n")
+    except IOError as e:
+        print(f"ERROR: Failed to compact {JOURNAL_FILE}: {e}")
+
+def _journal_size() -> int:
+    return os.path.getsize(JOURNAL_FILE) if os.path.exists(JOURNAL_FILE) else 0
+
+async def compact_journal():
+    """Writes a fresh snapshot off the event loop, then drops the journal records it covers."""
+    global _compaction_requested
+    _compaction_requested = False
+    async with _flush_lock:
+        if not await _flush_pending():
+            return
+        offset = _journal_size()
+        payload = _snapshot_payload()
+        if await asyncio.to_thread(_write_snapshot, payload) and offset:
+            await asyncio.to_thread(_drop_journal_prefix, offset)
+
+def _schedule_journal_compaction():
+    global _compaction_requested
+    if persistence_task and not persistence_task.done():
+        _compaction_requested = True
+        _save_requested.set()
+        return
+    # No persistence writer (e.g. shutdown handlers): compact inline.
+    offset = _journal_size()
+    if _write_snapshot(_snapshot_payload()):
+        _drop_journal_prefix(offset)
+
+# --- SQLITE STORAGE ---
+# PERSISTENCE_MODE=sqlite keeps the list in SQLITE_FILE instead of data.json. The
+# in-memory ListStore stays the source for lookups and the sorted views the bot renders
+# (see fetch_sorted_rows); query_view answers the same views with indexed queries for
+# reading the database on its own. Writes run in worker threads.
+
+SQLITE_FILE = "data.sqlite3"
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS uniques (
+    item_key   TEXT PRIMARY KEY,
+    item       TEXT NOT NULL,
+    owner      TEXT NOT NULL,
+    owner_key  TEXT NOT NULL,
+    cost       TEXT NOT NULL,
+    cost_num   INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    seq        INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_uniques_owner ON uniques (owner_key, cost_num DESC);
+CREATE INDEX IF NOT EXISTS idx_uniques_updated ON uniques (updated_at);
+CREATE INDEX IF NOT EXISTS idx_uniques_seq ON uniques (seq);
+CREATE INDEX IF NOT EXISTS idx_uniques_cost ON uniques (cost_num, item_key);
+CREATE TABLE IF NOT EXISTS bot_state (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# ORDER BY clauses matching the SORT_CONFIGS sort lambdas.
+SQLITE_VIEW_QUERIES = {
+    "sort_config_item": "SELECT item, owner, cost, updated_at FROM uniques ORDER BY item_key, owner_key",
+    "sort_config_name": "SELECT item, owner, cost, updated_at FROM uniques ORDER BY owner_key, item_key",
+    "sort_config_cost": "SELECT item, owner, cost, updated_at FROM uniques ORDER BY cost_num, item_key",
+    "sort_config_recent": "SELECT item, owner, cost, updated_at FROM uniques WHERE updated_at >= ? ORDER BY updated_at DESC, seq DESC",
+    "sort_config_owner": (
+        "SELECT u.item, u.owner, u.cost, u.updated_at FROM uniques u "
+        "JOIN (SELECT owner_key, COUNT(*) AS owned FROM uniques GROUP BY owner_key) t USING (owner_key) "
+        "ORDER BY t.owned DESC, u.owner_key, u.cost_num DESC, u.seq"
+    ),
+}
+
+def _sqlite_op(change):
+    op, value = change
+    if op == "put":
+        return ("put", tuple(value.to_json()))
+    if op == "reset":
+        return ("reset", [tuple(row.to_json()) for row in list_store])
+    return (op, value)
+
+class SqliteStorage:
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._seq = 0
+
+    def _connect(self):
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SQLITE_SCHEMA)
+            self._seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM uniques").fetchone()[0]
+        return self._conn
+
+    @staticmethod
+    def _cost_num(cost) -> int:
+        return int(cost) if str(cost).isdigit() else 0
+
+    def _put(self, conn, row):
+        item, owner, cost, updated_at = row
+        self._seq += 1
+        conn.execute(
+            "INSERT INTO uniques (item_key, item, owner, owner_key, cost, cost_num, updated_at, seq) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (item_key) DO UPDATE SET item = excluded.item, owner = excluded.owner, "
+            "owner_key = excluded.owner_key, cost = excluded.cost, cost_num = excluded.cost_num, "
+            "updated_at = excluded.updated_at, seq = excluded.seq",
+            (item.lower(), item, owner, owner.lower(), str(cost), self._cost_num(cost), updated_at or 0, self._seq)
+        )
+
+    def load(self):
+        """Returns (rows, channel_list_states), migrating DATA_FILE on first use."""
+        with _persistence_lock:
+            conn = self._connect()
+            migrated = conn.execute("SELECT value FROM bot_state WHERE key = 'migrated_from'").fetchone()
+            if migrated is None:
+                self._migrate_from_json(conn)
+            rows = [list(r) for r in conn.execute("SELECT item, owner, cost, updated_at FROM uniques ORDER BY seq")]
+            states_row = conn.execute("SELECT value FROM bot_state WHERE key = 'channel_list_states'").fetchone()
+        states = json.loads(states_row[0]) if states_row else {}
+        return rows, {int(k): v for k, v in states.items() if str(k).isdigit()}
+
+    def _migrate_from_json(self, conn):
+        rows, states = _read_data_file()
+        with conn:
+            for row in rows:
+                if len(row) >= 3:
+                    self._put(conn, (row[0], row[1], row[2], row[3] if len(row) > 3 else 0))
+            conn.execute("INSERT OR REPLACE INTO bot_state (key, value) VALUES ('channel_list_states', ?)",
+                         (json.dumps(states),))
+            conn.execute("INSERT OR REPLACE INTO bot_state (key, value) VALUES ('migrated_from', ?)", (DATA_FILE,))
+        print(f"Migrated {len(rows)} rows from {DATA_FILE} into {self.path}.")
+
+    def apply(self, ops: list, states_text: str) -> bool:
+        """Applies queued ListStore changes and the channel states in one transaction."""
+        global _saved_states_text
+        started = time.perf_counter()
+        try:
+            with _persistence_lock:
+                conn = self._connect()
+                with conn:
+                    for op, value in ops:
+                        if op == "put":
+                            self._put(conn, value)
+                        elif op == "del":
+                            conn.execute("DELETE FROM uniques WHERE item_key = ?", (value,))
+                        elif op == "reset":
+                            conn.execute("DELETE FROM uniques")
+                            for row in value:
+                                self._put(conn, row)
+                    if states_text != _saved_states_text:
+                        conn.execute("INSERT OR REPLACE INTO bot_state (key, value) VALUES ('channel_list_states', ?)",
+                                     (states_text,))
+        except sqlite3.Error as e:
+            print(f"ERROR: Failed to save data to {self.path}: {e}")
+            return False
+        _saved_states_text = states_text
+        persistence_stats["writes"] += 1
+        # SQLite decides itself what reaches the disk, so only the duration is recorded.
+        save_seconds.observe(time.perf_counter() - started, "sqlite")
+        return True
+
+    def query_view(self, sort_key: str) -> list:
+        with _persistence_lock:
+            conn = self._connect()
+            if sort_key == "sort_config_recent":
+                cur = conn.execute(SQLITE_VIEW_QUERIES[sort_key], (time.time() - SECONDS_IN_WEEK,))
+            else:
+                cur = conn.execute(SQLITE_VIEW_QUERIES[sort_key])
+            return [ListRow.from_json(r) for r in cur]
+
+
+sqlite_storage = SqliteStorage(SQLITE_FILE)
+
+def fetch_sorted_rows(sort_key: str) -> list:
+    """Rows for a SORT_CONFIGS view, from the store's materialized views in every mode.
+
+    The store holds the latest list, unsaved changes included. Reading SQLite instead
+    would have to flush those first, forcing a commit on every render cache miss.
+    """
+    return list_store.sorted_rows(SORT_CONFIGS[sort_key]["store_view"])
+
+# --- PERSISTENCE WRITER (GROUP COMMIT) ---
+# Mutations call request_save(); one background task flushes at most once every
+# SAVE_FLUSH_INTERVAL seconds, so a burst of saves costs a single write.
+
+SAVE_FLUSH_INTERVAL = float(os.environ.get("SAVE_FLUSH_INTERVAL", 2.0))
+persistence_stats = {"save_requests": 0, "coalesced": 0, "writes": 0}
+persistence_task = None
+_save_requested = asyncio.Event()
+# Held from popping changes until their write is done, so batches reach the disk in order.
+_flush_lock = asyncio.Lock()
+_compaction_requested = False
+
+def request_save():
+    """Marks the list dirty. The persistence writer (or a direct save without it) writes it out."""
+    persistence_stats["save_requests"] += 1
+    if not (persistence_task and not persistence_task.done()):
+        save_data_list()
+        return
+    if _save_requested.is_set():
+        persistence_stats["coalesced"] += 1
+    _save_requested.set()
+
+async def _flush_pending() -> bool:
+    """Writes the pending changes off the event loop; the caller holds _flush_lock."""
+    prepared = _prepare_save()
+    if not prepared:
+        return True
+    write, changes = prepared
+    try:
+        ok = await asyncio.to_thread(write)
+    except Exception as e:
+        print(f"ERROR: Save failed: {e}")
+        ok = False
+    if not ok:
+        list_store.requeue_changes(changes)
+    return ok
+
+async def flush_saves() -> bool:
+    """Writes everything pending now, after any flush already in progress. False if it failed."""
+    async with _flush_lock:
+        return await _flush_pending()
+
+async def persistence_writer():
+    while True:
+        await _save_requested.wait()
+        if not list_loaded:
+            # Keep the request pending until on_ready has loaded the list.
+            await asyncio.sleep(SAVE_FLUSH_INTERVAL)
+            continue
+        _save_requested.clear()
+        try:
+            with trace("save", mode=PERSISTENCE_MODE):
+                with span("write"):
+                    if not await flush_saves():
+                        # The changes are queued again; retry after the flush interval.
+                        _save_requested.set()
+                if _compaction_requested or journal_records_since_compaction >= JOURNAL_COMPACT_RECORDS:
+                    with span("compact_journal"):
+                        await compact_journal()
+        except Exception as e:
+            print(f"ERROR: Persistence writer failed: {e}")
+        await asyncio.sleep(SAVE_FLUSH_INTERVAL)
+
+def start_persistence_writer():
+    global persistence_task
+    if persistence_task is None or persistence_task.done():
+        persistence_task = asyncio.create_task(persistence_writer())
 
 # --- BOT STATE (CRASH/RESTART) HANDLING ---
 prev_shutdown_info = {}
@@ -260,6 +1411,8 @@ def save_bot_state(state: dict):
         print(f"ERROR: Failed to save bot state to {STATE_FILE}: {e}")
 
 def mark_clean_shutdown():
+    # Durability point: flush whatever the persistence writer has not written yet.
+    save_data_list()
     st = {"last_state": "stopped_clean", "timestamp": int(time.time()), "pid": os.getpid()}
     save_bot_state(st)
 
@@ -277,15 +1430,31 @@ def _signal_handler(sig, frame):
     except SystemExit:
         raise
 
+async def _shutdown():
+    # The final save waits for a write the persistence writer has in flight, so an older
+    # batch can't reach the journal after a newer one.
+    await flush_saves()
+    await client.close()
+
+def _request_shutdown(sig):
+    print(f"Received {signal.Signals(sig).name}, shutting down.")
+    _spawn(_shutdown())
+
 def register_signal_handlers():
-    try:
-        signal.signal(signal.SIGINT, _signal_handler)
-    except Exception:
-        pass
-    try:
-        signal.signal(signal.SIGTERM, _signal_handler)
-    except Exception:
-        pass
+    """Routes SIGINT/SIGTERM through the event loop where it can (not on Windows).
+
+    A plain signal handler interrupts whatever the loop is running, possibly between a
+    flush popping its batch and handing it to the writer thread; main() then does the
+    last flush once the client has closed, and atexit marks the clean shutdown.
+    """
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, _request_shutdown, sig)
+        except (NotImplementedError, RuntimeError):
+            try:
+                signal.signal(sig, _signal_handler)
+            except Exception:
+                pass
     atexit.register(mark_clean_shutdown)
 
 # Coroutine to send a crash embed; executed from on_ready where client is available
@@ -315,51 +1484,77 @@ async def send_bot_crash_embed(prev_info: dict):
 # --- VIEW CLASSES ---
 
 class EphemeralListView(View):
-    def __init__(self, initial_sort_key: str, timeout=300):
+    """Sort buttons plus Prev/Next paging. Only the sort key and page number are kept per view;
+    each click renders just the requested page (see render_list_page)."""
+
+    def __init__(self, initial_sort_key: str, timeout=300, page: int = 0, page_count: int = 1):
         super().__init__(timeout=timeout)
         self.current_sort_key = initial_sort_key
+        self.page = page
+        self.page_count = page_count
         self._update_button_states()
 
     def _update_button_states(self):
         for child in self.children:
             if isinstance(child, Button):
-                if child.custom_id == f"ephem_btn_{self.current_sort_key}":
+                if child.custom_id == "ephem_btn_prev":
+                    child.disabled = self.page <= 0
+                elif child.custom_id == "ephem_btn_next":
+                    child.disabled = self.page >= self.page_count - 1
+                elif child.custom_id == f"ephem_btn_{self.current_sort_key}":
                     child.disabled = True
                     child.style = ButtonStyle.success
                 else:
                     child.disabled = False
                     child.style = ButtonStyle.secondary
 
-    async def _update_ephemeral_message(self, interaction: discord.Interaction, new_sort_key: str):
-        self.current_sort_key = new_sort_key
+    async def _show_page(self, interaction: discord.Interaction, sort_key: str, page: int):
+        content_to_send, self.page, self.page_count = await render_list_page(sort_key, page)
+        self.current_sort_key = sort_key
         self._update_button_states()
-        full_content_parts = format_sorted_list_content(new_sort_key, is_ephemeral=True)
         try:
-            content_to_send = full_content_parts[0] if isinstance(full_content_parts, list) else full_content_parts
             await interaction.response.edit_message(content=content_to_send, view=self)
         except discord.HTTPException as e:
             pass
 
+    async def _update_ephemeral_message(self, interaction: discord.Interaction, new_sort_key: str):
+        await self._show_page(interaction, new_sort_key, 0)
+
     @button(label=SORT_CONFIGS["sort_config_item"]["button_label"], style=ButtonStyle.secondary, custom_id="ephem_btn_sort_config_item")
+    @traced
     async def sort_item_btn_e(self, i: discord.Interaction, b: Button):
         await self._update_ephemeral_message(i, "sort_config_item")
 
     @button(label=SORT_CONFIGS["sort_config_name"]["button_label"], style=ButtonStyle.secondary, custom_id="ephem_btn_sort_config_name")
+    @traced
     async def sort_name_btn_e(self, i: discord.Interaction, b: Button):
         await self._update_ephemeral_message(i, "sort_config_name")
 
     @button(label=SORT_CONFIGS["sort_config_cost"]["button_label"], style=ButtonStyle.secondary, custom_id="ephem_btn_sort_config_cost")
+    @traced
     async def sort_cost_btn_e(self, i: discord.Interaction, b: Button):
         await self._update_ephemeral_message(i, "sort_config_cost")
 
-    @button(label=SORT_CONFIGS["sort_config_recent"]["button_label"], style=ButtonStyle.secondary, custom_id="ephem_btn_sort_recent")
+    @button(label=SORT_CONFIGS["sort_config_recent"]["button_label"], style=ButtonStyle.secondary, custom_id="ephem_btn_sort_config_recent")
+    @traced
     async def sort_recent_btn_e(self, i: discord.Interaction, b: Button):
         await self._update_ephemeral_message(i, "sort_config_recent")
 
     @button(label=SORT_CONFIGS["sort_config_owner"]["button_label"], style=ButtonStyle.secondary, custom_id="ephem_btn_sort_config_owner")
+    @traced
     async def sort_owner_btn_e(self, i: discord.Interaction, b: Button):
         await self._update_ephemeral_message(i, "sort_config_owner")
 
+    @button(label="◀ Prev", style=ButtonStyle.secondary, custom_id="ephem_btn_prev", row=1)
+    @traced
+    async def prev_page_btn_e(self, i: discord.Interaction, b: Button):
+        await self._show_page(i, self.current_sort_key, self.page - 1)
+
+    @button(label="Next ▶", style=ButtonStyle.secondary, custom_id="ephem_btn_next", row=1)
+    @traced
+    async def next_page_btn_e(self, i: discord.Interaction, b: Button):
+        await self._show_page(i, self.current_sort_key, self.page + 1)
+
     async def on_timeout(self):
         pass
 
@@ -384,10 +1579,9 @@ class PersistentListPromptView(View):
                 except:
                     pass
 
-        full_content_parts = format_sorted_list_content(sort_key, is_ephemeral=True)
-        ephemeral_view = EphemeralListView(initial_sort_key=sort_key)
+        content_to_send, page, page_count = await render_list_page(sort_key)
+        ephemeral_view = EphemeralListView(initial_sort_key=sort_key, page=page, page_count=page_count)
         try:
-            content_to_send = full_content_parts[0] if isinstance(full_content_parts, list) else full_content_parts
             await interaction.response.send_message(content=content_to_send, view=ephemeral_view, ephemeral=True)
         except Exception as e:
             try:
@@ -396,22 +1590,27 @@ class PersistentListPromptView(View):
                 pass
 
     @button(label=SORT_CONFIGS["sort_config_item"]["button_label"], style=ButtonStyle.primary, custom_id="persist_btn_sort_item")
+    @traced
     async def sort_item_btn_p(self, i: discord.Interaction, b: Button):
         await self._send_ephemeral_sorted_list(i, "sort_config_item")
 
     @button(label=SORT_CONFIGS["sort_config_name"]["button_label"], style=ButtonStyle.primary, custom_id="persist_btn_sort_name")
+    @traced
     async def sort_name_btn_p(self, i: discord.Interaction, b: Button):
         await self._send_ephemeral_sorted_list(i, "sort_config_name")
 
     @button(label=SORT_CONFIGS["sort_config_cost"]["button_label"], style=ButtonStyle.primary, custom_id="persist_btn_sort_cost")
+    @traced
     async def sort_cost_btn_p(self, i: discord.Interaction, b: Button):
         await self._send_ephemeral_sorted_list(i, "sort_config_cost")
 
     @button(label=SORT_CONFIGS["sort_config_recent"]["button_label"], style=ButtonStyle.primary, custom_id="persist_btn_sort_recent")
+    @traced
     async def sort_recent_btn_p(self, i: discord.Interaction, b: Button):
         await self._send_ephemeral_sorted_list(i, "sort_config_recent")
 
     @button(label=SORT_CONFIGS["sort_config_owner"]["button_label"], style=ButtonStyle.primary, custom_id="persist_btn_sort_owner")
+    @traced
     async def sort_owner_btn_p(self, i: discord.Interaction, b: Button):
         await self._send_ephemeral_sorted_list(i, "sort_config_owner")
 
@@ -440,41 +1639,28 @@ def _update_last_changed_details(item_val, name_val, cost_val):
     last_updated_item_details = {"item_val": item_val, "name_val": name_val, "cost_val": cost_val}
 
 def update_data_for_auto(item_val, name_val):
-    global data_list
-    found_idx = -1
-    final_cost = "1"
-    for i, row in enumerate(data_list):
-        if row[0].lower() == item_val.lower():
-            found_idx = i
-            break
-
-    current_time_epoch = time.time()
-
-    if found_idx != -1:
-        existing_row = data_list.pop(found_idx)
-        existing_row[1] = name_val
-        try:
-            final_cost = str(int(existing_row[2]) + 1)
-        except ValueError:
-            final_cost = "1"
-        existing_row[2] = final_cost
-        existing_row[3] = current_time_epoch
-        data_list.append(existing_row)
-    else:
-        new_row = [item_val, name_val, final_cost, current_time_epoch]
-        data_list.append(new_row)
-
+    with span("store.upsert"):
+        row, _ = list_store.upsert(item_val, name_val)
+    final_cost = row.cost
     _update_last_changed_details(item_val, name_val, final_cost)
-    save_data_list()
+    request_save()
     return final_cost
 
 def format_list_for_display(data, col_indices, headers):
     if not data: return []
     widths = [len(h) for h in headers]
-    for r in data:
-        disp_row = [str(r[i]) for i in col_indices]
-        for i, val in enumerate(disp_row):
-            widths[i] = max(widths[i], len(val))
+    # Display strings are built once and reused for the widths and the lines. One getter
+    # call fetches all displayed columns: by attribute from a ListRow, by index from a
+    # plain [item, name, cost, timestamp] sequence.
+    by_attr = operator.attrgetter(*(ListRow.__slots__[i] for i in col_indices))
+    by_index = operator.itemgetter(*col_indices)
+    if len(col_indices) == 1:
+        # Getters for a single column return the value itself, not a 1-tuple.
+        disp_rows = [[str(by_attr(r) if type(r) is ListRow else by_index(r))] for r in data]
+    else:
+        disp_rows = [list(map(str, by_attr(r) if type(r) is ListRow else by_index(r))) for r in data]
+    for i, column in enumerate(zip(*disp_rows)):
+        widths[i] = max(widths[i], max(map(len, column)))
     padding = [2] * len(widths)
     total_line_length = sum(widths) + sum(padding) - padding[-1]
     if total_line_length > MAX_MESSAGE_LENGTH - 50:
@@ -484,9 +1670,9 @@ def format_list_for_display(data, col_indices, headers):
     message_parts = []
     current_part_lines = [header_line]
     current_length = len(header_line)
-    for row in data:
-        disp_row = [str(row[i]) for i in col_indices]
-        line = " ".join(f"{disp_row[i]:<{widths[i]}}" for i in range(len(headers)))
+    line_format = " ".join(f"{{:<{widths[i]}}}" for i in range(len(headers)))
+    for disp_row in disp_rows:
+        line = line_format.format(*disp_row)
         if current_length + len(line) + 1 + 100 > MAX_MESSAGE_LENGTH:
             message_parts.append("\n".join(current_part_lines))
             current_part_lines = [header_line, line]
@@ -498,35 +1684,43 @@ def format_list_for_display(data, col_indices, headers):
         message_parts.append("\n".join(current_part_lines))
     return message_parts
 
-def format_sorted_list_content(sort_key: str, is_ephemeral: bool = False):
+def _timestamp_base(epoch: int) -> str:
+    return f"<t:{epoch}:F> (<t:{epoch}:R>)"
+
+def _build_list_templates(sort_key: str, rows: list = None):
+    """Renders a sort view without its timestamp.
+
+    Returns (templates, expires_at). Each template is a (prefix, suffix) pair that
+    goes around the "Last Updated" timestamp, or (text, None) for a fixed message.
+    `rows` may hold the already sorted view from fetch_sorted_rows.
+    """
     sort_details = SORT_CONFIGS[sort_key]
-    list_data_source = data_list
+    list_data_source = list_store
     processed_data = []
-    current_epoch = int(time.time())
-    timestamp_base = f"<t:{current_epoch}:F> (<t:{current_epoch}:R>)"
+    timestamp_base = _timestamp_base(int(time.time()))
+    expires_at = None
 
     if sort_key == "sort_config_recent":
-        processed_data = sort_details["sort_lambda"](list_data_source)
+        processed_data = rows if rows is not None else list_data_source.sorted_rows(sort_details["store_view"])
         if not processed_data:
             empty_msg = "No items have been updated in the last 7 days."
-            timestamp_line = f"{empty_msg}\nLast Updated: {timestamp_base} (Sorted {sort_details['label']})"
-            return [timestamp_line]
+            return [(f"{empty_msg}\nLast Updated: ", f" (Sorted {sort_details['label']})")], None
+        # The view changes without a mutation once its oldest row drops out of the window.
+        expires_at = processed_data[-1].timestamp + SECONDS_IN_WEEK
         formatted_text_parts = format_list_for_display(processed_data,
                                                        sort_details["column_order_indices"],
                                                        sort_details["headers"])
     else:
         if not list_data_source:
-            timestamp_line = f"The list is currently empty.\nLast Updated: {timestamp_base} (List is Empty)"
-            return [timestamp_line]
-        processed_data = sort_details["sort_lambda"](list_data_source)
+            return [("The list is currently empty.\nLast Updated: ", " (List is Empty)")], None
+        processed_data = rows if rows is not None else list_data_source.sorted_rows(sort_details["store_view"])
         if not processed_data:
-            timestamp_line = f"The list is empty after applying the sort/filter.\nLast Updated: {timestamp_base} (List is Empty)"
-            return [timestamp_line]
+            return [("The list is empty after applying the sort/filter.\nLast Updated: ", " (List is Empty)")], None
         formatted_text_parts = format_list_for_display(processed_data,
                                                        sort_details["column_order_indices"],
                                                        sort_details["headers"])
 
-    final_message_parts = []
+    templates = []
     ts_msg_base = f"(Sorted {sort_details['label']})"
     code_block_overhead = 8
 
@@ -538,13 +1732,162 @@ def format_sorted_list_content(sort_key: str, is_ephemeral: bool = False):
         timestamp_line = f"Last Updated: {timestamp_base} | {part_header}{ts_msg_base}"
         content_length_with_meta = len(timestamp_line) + len(part) + code_block_overhead + 1
         if content_length_with_meta > MAX_MESSAGE_LENGTH:
-            final_message_parts.append(f"List is too large to display. Please contact an admin.")
+            templates.append(("List is too large to display. Please contact an admin.", None))
             break
 
-        final_message_parts.append(f"{timestamp_line}\n```\n{part}\n```")
+        templates.append(("Last Updated: ", f" | {part_header}{ts_msg_base}\n```\n{part}\n```"))
+
+    return (templates if templates else [("The list is currently empty.", None)]), expires_at
+
+def _stamp_list_templates(templates: list) -> list:
+    timestamp_base = _timestamp_base(int(time.time()))
+    return [prefix if suffix is None else f"{prefix}{timestamp_base}{suffix}" for prefix, suffix in templates]
 
-    return final_message_parts if final_message_parts else ["The list is currently empty."]
 
+class RenderCache:
+    """Rendered list templates per (store version, sort key, ephemeral flag).
+
+    Entries for older store versions are dropped on the next put, so any list
+    mutation invalidates the cache. Only the timestamp is spliced in per request.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, version: int, sort_key: str, is_ephemeral: bool):
+        entry = self._entries.get((version, sort_key, is_ephemeral))
+        if entry is not None and (entry[1] is None or time.time() < entry[1]):
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return None
+
+    def put(self, version: int, sort_key: str, is_ephemeral: bool, templates: list, expires_at=None):
+        if any(key[0] != version for key in self._entries):
+            self._entries = {key: entry for key, entry in self._entries.items() if key[0] == version}
+        self._entries[(version, sort_key, is_ephemeral)] = (templates, expires_at)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0}
+
+
+render_cache = RenderCache()
+
+async def render_list_content(sort_key: str, is_ephemeral: bool = False):
+    """All parts of a sort view, stamped with the current time, as sent to Discord."""
+    return _stamp_list_templates(await render_list_templates(sort_key, is_ephemeral))
+
+async def render_list_templates(sort_key: str, is_ephemeral: bool = False):
+    """The cached templates of a sort view; on a miss the rows come from fetch_sorted_rows."""
+    version = list_store.version
+    templates = render_cache.get(version, sort_key, is_ephemeral)
+    if templates is None:
+        rows = fetch_sorted_rows(sort_key)
+        started = time.perf_counter()
+        with span("render", sort_key=sort_key):
+            templates, expires_at = _build_list_templates(sort_key, rows)
+        render_seconds.observe(time.perf_counter() - started, sort_key)
+        # Don't cache rows that a mutation during the fetch has already made stale.
+        if list_store.version == version:
+            render_cache.put(version, sort_key, is_ephemeral, templates, expires_at)
+    return templates
+
+
+class ListPages:
+    """Layout of one sorted view, so any single page of it can be rendered on its own.
+
+    format_list_for_display pads every line to the same column widths, so all lines
+    have the same length and the rows per page follow from it: a page is a slice of
+    the view, laid out exactly like the matching part of the full list. Rendered pages
+    are kept per page number; like RenderCache, only the timestamp is spliced in per
+    request. A list mutation makes a new ListPages, which drops them.
+    """
+
+    def __init__(self, sort_key: str, rows: list):
+        sort_details = SORT_CONFIGS[sort_key]
+        self.sort_key = sort_key
+        self.rows = rows
+        self.label = sort_details["label"]
+        self.columns = operator.attrgetter(*(ListRow.__slots__[i] for i in sort_details["column_order_indices"]))
+        headers = sort_details["headers"]
+        widths = [len(h) for h in headers]
+        for i, name in enumerate(ListRow.__slots__[c] for c in sort_details["column_order_indices"]):
+            widths[i] = max(widths[i], max(len(str(getattr(row, name))) for row in rows))
+        self.line_format = " ".join(f"{{:<{width}}}" for width in widths)
+        self.header_line = self.line_format.format(*headers)
+        line_length = len(self.header_line)
+        # Same packing rule as format_list_for_display: lines + 100 chars of headroom.
+        self.rows_per_page = max(1, (MAX_MESSAGE_LENGTH - 100 - line_length) // (line_length + 1))
+        self.page_count = -(-len(rows) // self.rows_per_page)
+        self.expires_at = rows[-1].timestamp + SECONDS_IN_WEEK if sort_key == "sort_config_recent" else None
+        self._templates = {}
+
+    def render(self, page: int) -> str:
+        suffix = self._templates.get(page)
+        if suffix is None:
+            start = page * self.rows_per_page
+            lines = [self.header_line]
+            lines.extend(self.line_format.format(*map(str, self.columns(row)))
+                         for row in self.rows[start:start + self.rows_per_page])
+            body = "\n".join(lines)
+            page_header = f"Page {page+1}/{self.page_count} - " if self.page_count > 1 else ""
+            suffix = self._templates[page] = f" | {page_header}(Sorted {self.label})\n```\n{body}\n```"
+        return f"Last Updated: {_timestamp_base(int(time.time()))}{suffix}"
+
+
+# One ListPages per sort key for the current list version, shared by all open ephemeral
+# views; a view itself only keeps its sort key and page number.
+_list_pages_cache = {}
+
+async def get_list_pages(sort_key: str):
+    """ListPages for a sort view, or None if the view has no rows."""
+    global _list_pages_cache
+    version = list_store.version
+    pages = _list_pages_cache.get((version, sort_key))
+    if pages is not None and (pages.expires_at is None or time.time() < pages.expires_at):
+        return pages
+    rows = fetch_sorted_rows(sort_key)
+    if not rows:
+        return None
+    with span("render pages", sort_key=sort_key):
+        pages = ListPages(sort_key, rows)
+    if list_store.version == version:
+        _list_pages_cache = {key: value for key, value in _list_pages_cache.items() if key[0] == version}
+        _list_pages_cache[(version, sort_key)] = pages
+    return pages
+
+async def render_list_page(sort_key: str, page: int = 0):
+    """Renders one page of a sort view. Returns (content, page, page_count); page is clamped."""
+    pages = await get_list_pages(sort_key)
+    if pages is None:
+        # Empty list / nothing recent: the full render is a single fixed message.
+        return (await render_list_content(sort_key, is_ephemeral=True))[0], 0, 1
+    page = min(max(page, 0), pages.page_count - 1)
+    return pages.render(page), page, pages.page_count
+
+
+def _template_hash(template) -> str:
+    """Hash of a rendered part without its timestamp, to detect unchanged list messages."""
+    prefix, suffix = template
+    return hashlib.sha1(f"{prefix}\0{suffix}".encode()).hexdigest()[:16]
+
+# Totals over all persistent list syncs. "api_calls_saved" counts the fetches and
+# edits the old fetch-then-edit-every-part sync would have made on top of ours.
+# "last_sync" keeps the same numbers for the latest sync of each channel.
+list_sync_stats = {"syncs": 0, "api_calls": 0, "api_calls_saved": 0, "parts_skipped": 0,
+                   "last_refresh_seconds": 0.0, "last_refresh_channels": 0, "last_sync": {}}
+LIST_SYNC_CONCURRENCY = 5
+# Channels whose syncs failed because the bot can no longer see or post in them, with
+# the error. Regular refreshes skip them; a forced re-create tries them again.
+unreachable_list_channels = {}
+
+def _is_channel_error(e: Exception) -> bool:
+    """True for errors about the channel itself rather than one of its messages."""
+    return isinstance(e, discord.Forbidden) or (isinstance(e, discord.NotFound) and e.code == 10003)
 
 async def send_or_edit_persistent_list_prompt(target_channel_id: int, force_new: bool = False):
     global channel_list_states
@@ -553,99 +1896,311 @@ async def send_or_edit_persistent_list_prompt(target_channel_id: int, force_new:
 
     state = channel_list_states[target_channel_id]
     msg_ids = state.get("message_ids", [])
+    old_hashes = state.get("content_hashes", [])
+    if len(old_hashes) != len(msg_ids):
+        old_hashes = []
     default_sort = state.get("default_sort_key_for_display", DEFAULT_PERSISTENT_SORT_KEY)
 
     channel = client.get_channel(target_channel_id)
     if not channel:
         if state["message_ids"]:
             state["message_ids"] = []
-            save_data_list()
+            state["content_hashes"] = []
+            request_save()
         return
 
-    content_parts = format_sorted_list_content(default_sort, is_ephemeral=False)
+    templates = await render_list_templates(default_sort, is_ephemeral=False)
+    content_parts = _stamp_list_templates(templates)
+    new_hashes = [_template_hash(t) for t in templates]
     view = PersistentListPromptView(target_channel_id=target_channel_id)
+    api_calls = 0
+    api_calls_saved = 0
+    skipped = 0
+    errors = []
+
+    async def delete_part(msg_id) -> bool:
+        """False if the message may still be there; the next sync deletes it then."""
+        nonlocal api_calls, api_calls_saved
+        try:
+            await rest_pacer.pace(target_channel_id, "DELETE")
+            api_calls += 1
+            await channel.get_partial_message(msg_id).delete()
+            api_calls_saved += 1
+        except discord.NotFound:
+            pass
+        except Exception as e:
+            errors.append(e)
+            return False
+        if msg_id in view_message_tracker:
+            del view_message_tracker[msg_id]
+        return True
+
+    # Parts an earlier sync replaced but could not delete.
+    leftover = state.pop("stale_message_ids", [])
+    stale = [msg_id for msg_id in leftover if not await delete_part(msg_id)]
 
     ids_changed = False
-    if force_new or len(msg_ids) != len(content_parts):
+    # A sync cut short by a failed send left the first parts in place: finish the list
+    # instead of re-creating it.
+    resuming = state.get("incomplete") and len(msg_ids) < len(content_parts)
+    if force_new or (len(msg_ids) != len(content_parts) and not resuming):
         ids_changed = True
         for msg_id in msg_ids:
-            try:
-                old_msg = await channel.fetch_message(msg_id)
-                await old_msg.delete()
-            except:
-                pass
-            if msg_id in view_message_tracker:
-                del view_message_tracker[msg_id]
+            if not await delete_part(msg_id):
+                stale.append(msg_id)
         msg_ids = []
+        old_hashes = []
         state["message_ids"] = []
 
     sent_messages = []
+    # Positions in sent_messages whose message still shows older content.
+    outdated = set()
     for i, content in enumerate(content_parts):
         if i < len(msg_ids):
+            if i < len(old_hashes) and old_hashes[i] == new_hashes[i]:
+                # Same text as the last sync: no request at all. After a restart the
+                # buttons still need their view registered for the first part.
+                if i == 0 and msg_ids[0] not in view_message_tracker:
+                    client.add_view(view, message_id=msg_ids[0])
+                    view_message_tracker[msg_ids[0]] = ("PersistentListPromptView", target_channel_id)
+                sent_messages.append(msg_ids[i])
+                skipped += 1
+                api_calls_saved += 2
+                continue
             try:
-                m = await channel.fetch_message(msg_ids[i])
+                await rest_pacer.pace(target_channel_id, "PATCH")
+                api_calls += 1
+                m = channel.get_partial_message(msg_ids[i])
                 if i == 0:
                     await m.edit(content=content, view=view)
                     view_message_tracker[m.id] = ("PersistentListPromptView", target_channel_id)
                 else:
                     await m.edit(content=content, view=None)
                 sent_messages.append(m.id)
-            except (discord.NotFound, Exception):
-                ids_changed = True
-                new_m = None
-                if i == 0 and not sent_messages:
-                    new_m = await channel.send(content=content, view=view)
-                    view_message_tracker[new_m.id] = ("PersistentListPromptView", target_channel_id)
-                else:
-                    new_m = await channel.send(content=content, view=None)
-                sent_messages.append(new_m.id)
-        else:
-            ids_changed = True
-            try:
-                new_m = None
-                if i == 0 and not msg_ids:
-                    new_m = await channel.send(content=content, view=view)
-                    view_message_tracker[new_m.id] = ("PersistentListPromptView", target_channel_id)
-                else:
-                    new_m = await channel.send(content=content, view=None)
-                sent_messages.append(new_m.id)
-            except Exception as e:
+                api_calls_saved += 1
+                continue
+            except discord.NotFound:
+                # Deleted by hand: post a replacement below.
                 pass
-
-        await asyncio.sleep(0.5)
+            except Exception as e:
+                # The message is still there, so a replacement would only orphan it.
+                # Keep it in place; the retry sync edits it again.
+                errors.append(e)
+                outdated.add(len(sent_messages))
+                sent_messages.append(msg_ids[i])
+                continue
+        ids_changed = True
+        try:
+            new_m = None
+            await rest_pacer.pace(target_channel_id, "POST")
+            api_calls += 1
+            if i == 0 and not sent_messages:
+                new_m = await channel.send(content=content, view=view)
+                view_message_tracker[new_m.id] = ("PersistentListPromptView", target_channel_id)
+            else:
+                new_m = await channel.send(content=content, view=None)
+            sent_messages.append(new_m.id)
+        except Exception as e:
+            errors.append(e)
+            if i >= len(msg_ids):
+                # Later parts would land above the missing one; the retry sync posts them in order.
+                break
+            # Keep the slot so later parts keep their positions (and hashes): the deleted
+            # message's ID with no hash makes the retry sync get the 404 and post again.
+            outdated.add(len(sent_messages))
+            sent_messages.append(msg_ids[i])
 
     for old_msg_id in msg_ids[len(content_parts):]:
         ids_changed = True
-        try:
-            old_msg = await channel.fetch_message(old_msg_id)
-            await old_msg.delete()
-        except:
-            pass
-        if old_msg_id in view_message_tracker:
-            del view_message_tracker[old_msg_id]
+        if not await delete_part(old_msg_id):
+            stale.append(old_msg_id)
 
     if set(state["message_ids"]) != set(sent_messages):
         ids_changed = True
 
     state["message_ids"] = sent_messages
+    hashes = [None if i in outdated else h for i, h in enumerate(new_hashes[:len(sent_messages)])]
+    if hashes != state.get("content_hashes"):
+        state["content_hashes"] = hashes
+        ids_changed = True
+    if len(sent_messages) < len(content_parts):
+        state["incomplete"] = True
+    else:
+        state.pop("incomplete", None)
+    if stale:
+        state["stale_message_ids"] = stale
+    if stale != leftover:
+        ids_changed = True
+
+    list_sync_stats["syncs"] += 1
+    list_sync_stats["api_calls"] += api_calls
+    list_sync_stats["api_calls_saved"] += api_calls_saved
+    list_sync_stats["parts_skipped"] += skipped
+    list_sync_stats["last_sync"][target_channel_id] = {
+        "api_calls": api_calls, "api_calls_saved": api_calls_saved, "skipped": skipped,
+        "parts": len(content_parts), "failed": len(errors),
+    }
 
     if ids_changed:
-        save_data_list()
+        request_save()
+    if errors:
+        # The state above matches what is on Discord; the scheduler retries the rest.
+        raise errors[0]
 
 
 async def update_all_persistent_list_prompts(force_new: bool = False):
-    """Iterates through all configured channels and calls the update/edit function."""
-    for cid in INTERACTIVE_LIST_TARGET_CHANNEL_IDS:
-        if cid and isinstance(cid, int):
-            await send_or_edit_persistent_list_prompt(cid, force_new)
-        await asyncio.sleep(1)
+    """Updates all configured channels concurrently (at most LIST_SYNC_CONCURRENCY at once).
+
+    Channels have their own rate-limit buckets; within a channel, rest_pacer spaces
+    the calls. The first error is re-raised once every channel has finished.
+    Channels in unreachable_list_channels are only synced when force_new is set.
+    """
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(LIST_SYNC_CONCURRENCY)
+    channel_ids = [cid for cid in INTERACTIVE_LIST_TARGET_CHANNEL_IDS if cid and isinstance(cid, int)
+                   and (force_new or cid not in unreachable_list_channels)]
+
+    async def sync_channel(cid):
+        async with semaphore:
+            with span("list sync", channel=cid) as sync_span:
+                list_sync_stats["last_sync"].pop(cid, None)
+                try:
+                    await send_or_edit_persistent_list_prompt(cid, force_new)
+                except Exception as e:
+                    if _is_channel_error(e):
+                        print(f"ERROR: Channel {cid} is not accessible, skipping it until a forced refresh: {e}")
+                        unreachable_list_channels[cid] = str(e)
+                    raise
+                else:
+                    unreachable_list_channels.pop(cid, None)
+                finally:
+                    if sync_span is not None:
+                        sync_span.attrs.update(list_sync_stats["last_sync"].get(cid, {}))
+
+    results = await asyncio.gather(*(sync_channel(cid) for cid in channel_ids), return_exceptions=True)
+    list_sync_stats["last_refresh_seconds"] = time.perf_counter() - start
+    list_sync_stats["last_refresh_channels"] = len(channel_ids)
+    errors = [r for r in results if isinstance(r, Exception)]
+    for e in errors:
+        print(f"ERROR: List sync failed: {e}")
+    if errors:
+        raise errors[0]
+
+
+# --- LIST REFRESH SCHEDULER ---
+# Callers ask for a refresh instead of running update_all_persistent_list_prompts
+# themselves, so a burst of forges costs one sync instead of one per message.
+
+REFRESH_DEBOUNCE_SECONDS = 1.0
+REFRESH_MAX_DELAY_SECONDS = 4.0
+REFRESH_RETRY_SECONDS = 10.0
+REFRESH_RETRY_MAX_SECONDS = 600.0
+
+class ListRefreshScheduler:
+    """Runs update_all_persistent_list_prompts on behalf of refresh requests.
+
+    A sync starts once no new request came in for REFRESH_DEBOUNCE_SECONDS, and
+    never later than REFRESH_MAX_DELAY_SECONDS after the first waiting request.
+    Requests made while a sync runs are folded into a single follow-up sync.
+    force_new skips the debounce and makes the next sync a full re-create.
+    A failed sync is retried REFRESH_RETRY_SECONDS later, doubling the delay after
+    every further failure up to REFRESH_RETRY_MAX_SECONDS; a successful sync resets it.
+    """
+
+    def __init__(self):
+        self.task = None
+        self.stats = {"requests": 0, "coalesced": 0, "syncs": 0, "retries": 0, "failures_in_a_row": 0}
+        self._retry_handle = None
+        self._wakeup = asyncio.Event()
+        self._urgent = asyncio.Event()
+        self._pending = None
+        self._force_new = False
+        self._first_request = 0.0
+        self._last_request = 0.0
+
+    def request(self, force_new: bool = False) -> asyncio.Future:
+        """Schedules a refresh. The returned future resolves when a sync covering it has run,
+        to None or to the error that sync failed with; it never raises, so callers that
+        already changed the list can still answer the user."""
+        loop = asyncio.get_running_loop()
+        self.stats["requests"] += 1
+        now = loop.time()
+        if self._pending is None:
+            self._pending = loop.create_future()
+            self._first_request = now
+        else:
+            self.stats["coalesced"] += 1
+        self._last_request = now
+        self._force_new = self._force_new or force_new
+        if force_new:
+            self._urgent.set()
+        self._wakeup.set()
+        if self.task is None or self.task.done():
+            self.task = loop.create_task(self._run())
+        waiting = open_span("wait list refresh", force_new=force_new)
+        if waiting is not None:
+            self._pending.add_done_callback(lambda f: waiting.finish())
+        return self._pending
+
+    def _retry(self):
+        self._retry_handle = None
+        self.stats["retries"] += 1
+        self.request()
+
+    def retry_delay(self) -> float:
+        """Delay before the retry of the latest failed sync."""
+        failures = max(self.stats["failures_in_a_row"], 1)
+        return min(REFRESH_RETRY_SECONDS * 2 ** (failures - 1), REFRESH_RETRY_MAX_SECONDS)
+
+    async def _run(self):
+        # The task inherits the context of whichever request started it; syncs get their own traces.
+        _current_span.set(None)
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            while not self._force_new:
+                deadline = min(self._last_request + REFRESH_DEBOUNCE_SECONDS,
+                               self._first_request + REFRESH_MAX_DELAY_SECONDS)
+                delay = deadline - loop.time()
+                if delay <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._urgent.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            self._urgent.clear()
+            future, force_new = self._pending, self._force_new
+            self._pending, self._force_new = None, False
+
+            self.stats["syncs"] += 1
+            try:
+                with trace("list refresh", force_new=force_new):
+                    await update_all_persistent_list_prompts(force_new=force_new)
+            except Exception as e:
+                self.stats["failures_in_a_row"] += 1
+                print(f"ERROR: List refresh failed: {e}")
+                future.set_result(e)
+                # Parts that could not be edited are only repaired by another sync. One retry
+                # is pending at a time; failed syncs in between don't add more.
+                if self._retry_handle is None:
+                    self._retry_handle = loop.call_later(self.retry_delay(), self._retry)
+            else:
+                self.stats["failures_in_a_row"] = 0
+                future.set_result(None)
+
+
+list_refresh_scheduler = ListRefreshScheduler()
+
+def request_list_refresh(force_new: bool = False) -> asyncio.Future:
+    return list_refresh_scheduler.request(force_new)
 
 
 async def clear_all_persistent_list_prompts():
     """Deletes all messages and clears the state in memory AND file."""
     for cid in list(channel_list_states.keys()):
         state = channel_list_states[cid]
-        msg_ids = state.get("message_ids", [])
+        msg_ids = state.get("message_ids", []) + state.pop("stale_message_ids", [])
         for msg_id in msg_ids:
             if not msg_id: continue
             channel = client.get_channel(cid)
@@ -653,19 +2208,93 @@ async def clear_all_persistent_list_prompts():
                 state["message_ids"] = []
                 continue
             try:
-                m = await channel.fetch_message(msg_id)
-                await m.delete()
+                await rest_pacer.pace(cid, "DELETE")
+                await channel.get_partial_message(msg_id).delete()
             except:
                 pass
             if msg_id in view_message_tracker:
                 del view_message_tracker[msg_id]
-            await asyncio.sleep(0.5)
         state["message_ids"] = []
-    save_data_list()
-
-
-async def send_custom_update_notifications(item_val, name_val, cost_val):
-    """Sends a notification to all configured channels."""
+        state["content_hashes"] = []
+    request_save()
+
+
+# --- NOTIFICATION DISPATCHER ---
+# Outbound announcements go through one queue per channel with its own worker, so
+# channels are served in parallel while each channel keeps its message order.
+
+NOTIFY_MAX_ATTEMPTS = 4
+NOTIFY_RETRY_BASE_DELAY = 1.0
+
+class NotificationDispatcher:
+    def __init__(self):
+        self._queues = {}
+        self._workers = {}
+        self.stats = {"enqueued": 0, "delivered": 0, "failed": 0, "retries": 0,
+                      "latency_total": 0.0, "latency_max": 0.0}
+
+    def queue_depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    def send(self, channel_id: int, **send_kwargs) -> asyncio.Future:
+        """Queues channel.send(**send_kwargs). The future resolves to the sent message."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        queue = self._queues.setdefault(channel_id, asyncio.Queue())
+        queue.put_nowait((time.monotonic(), send_kwargs, future, _current_span.get()))
+        self.stats["enqueued"] += 1
+        worker = self._workers.get(channel_id)
+        if worker is None or worker.done():
+            self._workers[channel_id] = loop.create_task(self._worker(channel_id, queue))
+        return future
+
+    async def _worker(self, channel_id: int, queue: asyncio.Queue):
+        # Deliveries are traced under the span that queued them, not the one that started the worker.
+        _current_span.set(None)
+        while True:
+            enqueued_at, send_kwargs, future, origin = await queue.get()
+            try:
+                with span("notify", parent=origin, channel=channel_id):
+                    message = await self._deliver(channel_id, send_kwargs)
+            except Exception as e:
+                self.stats["failed"] += 1
+                print(f"ERROR: Notification to {channel_id} failed: {e}")
+                future.set_exception(e)
+            else:
+                latency = time.monotonic() - enqueued_at
+                self.stats["delivered"] += 1
+                self.stats["latency_total"] += latency
+                self.stats["latency_max"] = max(self.stats["latency_max"], latency)
+                future.set_result(message)
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, channel_id: int, send_kwargs: dict):
+        """Sends with retries and exponential backoff on 429, 5xx and connection errors."""
+        for attempt in range(1, NOTIFY_MAX_ATTEMPTS + 1):
+            channel = client.get_channel(channel_id)
+            if channel is None:
+                raise LookupError(f"channel {channel_id} not found")
+            try:
+                await rest_pacer.pace(channel_id, "POST")
+                return await channel.send(**send_kwargs)
+            except discord.HTTPException as e:
+                retryable = e.status == 429 or e.status >= 500
+                if not retryable or attempt == NOTIFY_MAX_ATTEMPTS:
+                    raise
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == NOTIFY_MAX_ATTEMPTS:
+                    raise
+            self.stats["retries"] += 1
+            await asyncio.sleep(NOTIFY_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+
+notification_dispatcher = NotificationDispatcher()
+
+def send_custom_update_notifications(item_val, name_val, cost_val) -> list:
+    """Queues a notification for all configured channels. Returns the delivery futures."""
+    futures = []
     for cfg in UPDATE_NOTIFICATION_CONFIG:
         cid, fmt, rid = cfg.get("channel_id"), cfg.get("message_format"), cfg.get("role_id_to_ping")
         if not cid or not fmt or cid == 0: continue
@@ -680,17 +2309,514 @@ async def send_custom_update_notifications(item_val, name_val, cost_val):
             content = fmt.format(item_val=item_val, name_val=name_val, cost_val=cost_val, role_ping=p_str)
         except KeyError as e:
             continue
+        mentions = discord.AllowedMentions.none()
+        if rid and rid != 0 and p_str:
+            mentions.roles = [discord.Object(id=rid)]
+        futures.append(notification_dispatcher.send(cid, content=content, allowed_mentions=mentions))
+    return futures
+
+# --- SERVER CODE CACHE ---
+# /list server_codes answers from a per-map cache: fresh for SERVER_CODES_TTL seconds,
+# then served stale (while one background fetch revalidates it) up to
+# SERVER_CODES_STALE_TTL. Concurrent requests for a map share one upstream fetch,
+# and all fetches reuse one pooled aiohttp session.
+
+class ServerCodeError(Exception):
+    """The findEach API could not be reached or answered with an error; str() is user-facing."""
+
+class ServerCodeCache:
+    def __init__(self, url_template: str, ttl: float, stale_ttl: float):
+        self.url_template = url_template
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.session = None
+        self._entries = {}
+        self._inflight = {}
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "fetches": 0, "errors": 0}
+
+    def start(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10),
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+            )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def cached(self, map_id: int):
+        """Returns (age_seconds, data) of the cached response, or None."""
+        entry = self._entries.get(map_id)
+        if entry is None:
+            return None
+        return time.monotonic() - entry[0], entry[1]
+
+    async def get(self, map_id: int) -> dict:
+        cached = self.cached(map_id)
+        if cached is not None:
+            age, data = cached
+            if age < self.ttl:
+                self.stats["hits"] += 1
+                return data
+            if age < self.stale_ttl:
+                self.stats["stale_hits"] += 1
+                self.refresh(map_id)
+                return data
+        self.stats["misses"] += 1
+        # Shielded so one impatient caller can't cancel the fetch the others wait on.
+        return await asyncio.shield(self.refresh(map_id))
+
+    def refresh(self, map_id: int) -> asyncio.Task:
+        """Starts a fetch for the map unless one is already running, and returns it."""
+        task = self._inflight.get(map_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch(map_id))
+            self._inflight[map_id] = task
+            task.add_done_callback(lambda t: self._fetch_done(map_id, t))
+        return task
+
+    def _fetch_done(self, map_id: int, task: asyncio.Task):
+        self._inflight.pop(map_id, None)
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(self, map_id: int) -> dict:
+        self.stats["fetches"] += 1
+        self.start()
         try:
-            mentions = discord.AllowedMentions.none()
-            if rid and rid != 0 and p_str:
-                mentions.roles = [discord.Object(id=rid)]
-            await chan.send(content, allowed_mentions=mentions)
+            async with self.session.get(self.url_template.format(map_id)) as response:
+                if response.status != 200:
+                    raise ServerCodeError(f"API error (HTTP {response.status})")
+                data = await response.json()
+        except ServerCodeError:
+            self.stats["errors"] += 1
+            raise
         except Exception as e:
-            pass
-        await asyncio.sleep(0.5)
+            self.stats["errors"] += 1
+            raise ServerCodeError(f"API request failed:\n```{e}```") from e
+        self._entries[map_id] = (time.monotonic(), data)
+        return data
+
+
+server_code_cache = ServerCodeCache(BASE_URL, SERVER_CODES_TTL, SERVER_CODES_STALE_TTL)
+
+class ServerCodePoller:
+    """Refreshes every map in server_code_cache every SERVER_CODES_POLL_INTERVAL seconds."""
+
+    def __init__(self, cache: ServerCodeCache, map_count: int, interval: float):
+        self.cache = cache
+        self.map_count = map_count
+        self.interval = interval
+        self.task = None
+        self.stats = {"polls": 0, "errors": 0, "last_poll_seconds": 0.0}
+
+    def start(self):
+        if self.interval > 0 and (self.task is None or self.task.done()):
+            self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self.poll_once()
+            await asyncio.sleep(self.interval)
+
+    async def poll_once(self):
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self.cache.refresh(map_id) for map_id in range(self.map_count)),
+                                       return_exceptions=True)
+        self.stats["polls"] += 1
+        self.stats["errors"] += sum(1 for r in results if isinstance(r, Exception))
+        self.stats["last_poll_seconds"] = time.perf_counter() - start
+
+    def snapshot_age(self):
+        """Age in seconds of the oldest cached map, or None while nothing is cached."""
+        cached = [self.cache.cached(map_id) for map_id in range(self.map_count)]
+        ages = [entry[0] for entry in cached if entry is not None]
+        return max(ages) if ages else None
+
+
+server_code_poller = ServerCodePoller(server_code_cache, len(SERVER_CODE_MAP_NAMES), SERVER_CODES_POLL_INTERVAL)
+
+def _region_label(server_key: str) -> str:
+    # Zoek regio label op basis van sleutelwoord in server_key
+    return next((label for keyword, label in REGION_LABELS.items() if keyword in server_key), f"🌐 {server_key}")
+
+# --- HISTORY BACKFILL ---
+# /list backfill rebuilds the list from the forge bot's own announcements when data.json
+# is lost or has fallen behind. The channel history is streamed oldest first and parsed
+# in batches into a tally (every forge is +1 cost, the last forger owns the item). After
+# each batch the tally and the last scanned message ID are checkpointed, so an interrupted
+# run can be resumed. The list itself is only changed, saved and refreshed once, at the end.
+
+BACKFILL_CHECKPOINT_FILE = "backfill_checkpoint.json"
+BACKFILL_BATCH_SIZE = 500
+BACKFILL_PROGRESS_INTERVAL = 5.0
+_backfill_lock = asyncio.Lock()
+
+def load_backfill_checkpoint():
+    if not os.path.exists(BACKFILL_CHECKPOINT_FILE):
+        return None
+    try:
+        with open(BACKFILL_CHECKPOINT_FILE, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"ERROR: Failed to read backfill checkpoint {BACKFILL_CHECKPOINT_FILE}: {e}")
+        return None
+
+def save_backfill_checkpoint(checkpoint: dict):
+    try:
+        tmp = BACKFILL_CHECKPOINT_FILE + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(checkpoint, f, separators=(",", ":"))
+        os.replace(tmp, BACKFILL_CHECKPOINT_FILE)
+    except Exception as e:
+        print(f"ERROR: Failed to save backfill checkpoint to {BACKFILL_CHECKPOINT_FILE}: {e}")
+
+def clear_backfill_checkpoint():
+    try:
+        os.remove(BACKFILL_CHECKPOINT_FILE)
+    except FileNotFoundError:
+        pass
+
+def _parse_forge_batch(messages: list, tally: dict) -> int:
+    """Folds the forge-bot announcements in a batch of messages into the tally. Returns how many matched."""
+    parsed = 0
+    for m in messages:
+        if m.author.id != TARGET_BOT_ID_FOR_AUTO_UPDATES:
+            continue
+        match = AUTO_UPDATE_MESSAGE_REGEX.search(m.content)
+        if not match:
+            continue
+        item_val, name_val = match.group(1).strip(), match.group(2).strip()
+        forged_at = m.created_at.timestamp()
+        row = tally.get(item_val.lower())
+        if row is None:
+            tally[item_val.lower()] = [item_val, name_val, 1, forged_at]
+        else:
+            row[1], row[2], row[3] = name_val, row[2] + 1, forged_at
+        parsed += 1
+    return parsed
+
+def _apply_backfill(tally: dict, mode: str) -> int:
+    """Writes the tally into list_store and returns how many items changed.
+
+    "rebuild" replaces the list with the tally. "reconcile" keeps the current list and only
+    takes an item from the tally if it was forged later than the stored row or was forged
+    more often than the stored cost says.
+    """
+    rows = sorted((ListRow(item, name, count, forged_at) for item, name, count, forged_at in tally.values()),
+                  key=lambda row: row.timestamp)
+    if mode == "rebuild":
+        list_store.replace(rows)
+        return len(rows)
+
+    changed = 0
+    for row in rows:
+        stored = list_store.get(row.item)
+        if stored is None:
+            list_store.put(row)
+            changed += 1
+            continue
+        cost = max(stored.cost, row.cost)
+        if row.timestamp > stored.timestamp:
+            list_store.put(ListRow(row.item, row.name, cost, row.timestamp))
+        elif cost != stored.cost:
+            list_store.put(ListRow(stored.item, stored.name, cost, stored.timestamp))
+        else:
+            continue
+        changed += 1
+    return changed
+
+async def run_history_backfill(channel, mode: str, checkpoint: dict = None, progress=None) -> dict:
+    """Streams the channel history into a forge tally and applies it to the list.
+
+    `checkpoint` resumes an earlier run. `progress` is awaited with the running checkpoint
+    at most every BACKFILL_PROGRESS_INTERVAL seconds. Returns the final checkpoint, with
+    "changed" set to the number of list items that were written.
+    """
+    checkpoint = checkpoint or {
+        "channel_id": channel.id, "mode": mode, "last_message_id": None,
+        "scanned": 0, "parsed": 0, "tally": [],
+    }
+    tally = {row[0].lower(): row for row in checkpoint["tally"]}
+    after = discord.Object(id=checkpoint["last_message_id"]) if checkpoint["last_message_id"] else None
+    started = time.monotonic()
+    scanned_at_start = checkpoint["scanned"]
+    last_progress = started
+    batch = []
+
+    async def flush():
+        nonlocal last_progress
+        checkpoint["parsed"] += _parse_forge_batch(batch, tally)
+        checkpoint["scanned"] += len(batch)
+        checkpoint["last_message_id"] = batch[-1].id
+        checkpoint["tally"] = list(tally.values())
+        elapsed = time.monotonic() - started
+        checkpoint["rate"] = (checkpoint["scanned"] - scanned_at_start) / elapsed if elapsed > 0 else 0.0
+        batch.clear()
+        await asyncio.to_thread(save_backfill_checkpoint, checkpoint)
+        if progress and time.monotonic() - last_progress >= BACKFILL_PROGRESS_INTERVAL:
+            last_progress = time.monotonic()
+            await progress(checkpoint)
+
+    async for message in channel.history(limit=None, after=after, oldest_first=True):
+        batch.append(message)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            await flush()
+    if batch:
+        await flush()
+
+    checkpoint.setdefault("rate", 0.0)
+    with span("store.backfill", mode=checkpoint["mode"]):
+        checkpoint["changed"] = _apply_backfill(tally, checkpoint["mode"])
+    # One save and one refresh for the whole run.
+    request_save()
+    request_list_refresh()
+    clear_backfill_checkpoint()
+    print(f"Backfill of channel {channel.id} done: {checkpoint['scanned']} messages scanned, "
+          f"{checkpoint['parsed']} forges parsed, {checkpoint['changed']} items written ({checkpoint['rate']:.0f} msg/s).")
+    return checkpoint
+
+def _backfill_progress_line(checkpoint: dict) -> str:
+    return (f"{checkpoint['scanned']:,} messages scanned, {checkpoint['parsed']:,} forges parsed, "
+            f"{len(checkpoint['tally']):,} unique items, {checkpoint.get('rate', 0.0):,.0f} msg/s")
+
+# --- PROFILER ---
+# /list profile watches the live bot for a few seconds. A StackSampler thread records the
+# stack of every thread each PROFILE_SAMPLE_INTERVAL; on the event loop thread the outermost
+# coroutine frame tells which task was running. mode "cprofile" additionally runs cProfile on
+# the loop thread, which is exact but slows every callback down while it runs.
+
+PROFILE_MAX_SECONDS = 60
+PROFILE_SAMPLE_INTERVAL = 0.005
+PROFILE_MAX_DEPTH = 128
+PROFILE_TOP = 30
+# Innermost frames of a thread that is waiting rather than working.
+PROFILE_IDLE_FRAMES = {("select", "selectors.py"), ("wait", "threading.py"), ("_worker", "thread.py")}
+_profile_lock = asyncio.Lock()
+
+def _code_label(code) -> str:
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def _running_coroutine(codes: list):
+    """The code of the task (or callback) running on the event loop, from innermost-first codes."""
+    # From the outside in: run_forever > _run_once > Handle._run > the task's coroutine.
+    for i in range(len(codes) - 1, 0, -1):
+        if codes[i].co_name == "_run" and codes[i].co_filename.endswith("events.py"):
+            return codes[i - 1]
+    return None
+
+class StackSampler(threading.Thread):
+    def __init__(self, loop_thread_id: int, interval: float):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.samples = 0
+        self.loop_samples = 0
+        self.loop_idle = 0
+        self.cost = 0.0  # seconds spent taking samples
+        self.functions_self = Counter()
+        self.functions_total = Counter()
+        self.coroutines = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            started = time.perf_counter()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._sample(thread_id, frame)
+            self.samples += 1
+            self.cost += time.perf_counter() - started
+
+    def _sample(self, thread_id: int, frame):
+        codes = []
+        while frame is not None and len(codes) < PROFILE_MAX_DEPTH:
+            codes.append(frame.f_code)
+            frame = frame.f_back
+        idle = (codes[0].co_name, os.path.basename(codes[0].co_filename)) in PROFILE_IDLE_FRAMES
+        if thread_id == self.loop_thread_id:
+            self.loop_samples += 1
+            if idle:
+                self.loop_idle += 1
+                return
+            coroutine = _running_coroutine(codes)
+            if coroutine is not None:
+                self.coroutines[_code_label(coroutine)] += 1
+        elif idle:
+            return
+        self.functions_self[_code_label(codes[0])] += 1
+        self.functions_total.update({_code_label(code) for code in codes})
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def _format_counts(title: str, counts: Counter, total: int) -> list:
+    lines = [f"== {title} ==", f"{'share':>7} {'samples':>8}  function"]
+    for label, count in counts.most_common(PROFILE_TOP):
+        lines.append(f"{count / total:>7.1%} {count:>8}  {label}")
+    return lines if counts else lines + ["(no samples)"]
+
+async def run_profile(seconds: float, mode: str = "sampling") -> str:
+    """Profiles the bot for `seconds` and returns the text report."""
+    sampler = StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL)
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+    started = time.perf_counter()
+    sampler.start()
+    if profiler:
+        profiler.enable()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        if profiler:
+            profiler.disable()
+        sampler.stop()
+    elapsed = time.perf_counter() - started
+
+    loop_busy = sampler.loop_samples - sampler.loop_idle
+    lines = [
+        f"Profile of {elapsed:.1f}s ({mode}), {sampler.samples} samples every {PROFILE_SAMPLE_INTERVAL * 1000:.0f} ms",
+        f"Event loop busy in {loop_busy / sampler.loop_samples:.1%} of its samples" if sampler.loop_samples else
+        "Event loop thread was not sampled",
+        f"Sampler cost {sampler.cost * 1000:.0f} ms ({sampler.cost / elapsed:.2%} of the window)",
+        "",
+    ]
+    lines += _format_counts("Busiest coroutines (event loop samples while busy)", sampler.coroutines, max(loop_busy, 1))
+    lines.append("")
+    total = max(sum(sampler.functions_self.values()), 1)
+    lines += _format_counts("Top functions by cumulative samples (all threads, busy only)",
+                            sampler.functions_total, total)
+    lines.append("")
+    lines += _format_counts("Top functions by own samples", sampler.functions_self, total)
+    if profiler:
+        buffer = io.StringIO()
+        pstats.Stats(profiler, stream=buffer).sort_stats("cumulative").print_stats(PROFILE_TOP)
+        lines += ["", "== cProfile of the event loop thread, by cumulative time ==", buffer.getvalue()]
+    return "\n".join(lines)
+
+# --- EVENT LOOP WATCHDOG ---
+# loop_lag_monitor wakes up every LOOP_LAG_INTERVAL and records a heartbeat. When a blocking
+# call (a big json.dump, a full sort) keeps the loop from waking, the LoopWatchdog thread
+# notices the missing heartbeat after LOOP_STALL_THRESHOLD and captures the loop thread's
+# stack while it is still stuck. Finished stalls are kept for /health and /list stats and
+# appended as JSON lines to LOOP_STALL_LOG next to STATE_FILE.
+
+LOOP_STALL_THRESHOLD = float(os.environ.get("LOOP_STALL_THRESHOLD", 0.25))
+LOOP_WATCHDOG_INTERVAL = 0.05
+LOOP_STALL_LOG = os.path.join(os.path.dirname(STATE_FILE), "loop_stalls.jsonl")
+LOOP_STALL_LOG_MAX_BYTES = 1_000_000
+LOOP_HEALTH_WINDOW = 300  # /health reports "degraded" for this long after a stall
+loop_health = {"last_lag": 0.0, "max_lag": 0.0, "stalls": 0, "last_beat": None}
+loop_stalls = deque(maxlen=20)
+loop_watchdog = None
+
+async def loop_lag_monitor():
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        now = time.perf_counter()
+        lag = max(0.0, now - started - LOOP_LAG_INTERVAL)
+        loop_lag_seconds.observe(lag)
+        loop_health["last_lag"] = lag
+        loop_health["max_lag"] = max(loop_health["max_lag"], lag)
+        loop_health["last_beat"] = now
+
+class LoopWatchdog(threading.Thread):
+    def __init__(self, loop_thread_id: int):
+        super().__init__(name="loop-watchdog", daemon=True)
+        self.loop_thread_id = loop_thread_id
+        self._stop_event = threading.Event()
+
+    def run(self):
+        stall = None
+        while not self._stop_event.wait(LOOP_WATCHDOG_INTERVAL):
+            beat = loop_health["last_beat"]
+            if beat is None:
+                continue
+            if stall is None:
+                if time.perf_counter() - beat - LOOP_LAG_INTERVAL >= LOOP_STALL_THRESHOLD:
+                    stall = self._capture(beat)
+            elif beat != stall["beat"]:
+                # The loop woke up again; loop_lag_monitor has measured how long it was gone.
+                self._record(stall, loop_health["last_lag"])
+                stall = None
+
+    def _capture(self, beat: float) -> dict:
+        frame = sys._current_frames().get(self.loop_thread_id)
+        codes = []
+        stack = []
+        if frame is not None:
+            f = frame
+            while f is not None and len(codes) < PROFILE_MAX_DEPTH:
+                codes.append(f.f_code)
+                f = f.f_back
+            stack = [f"{os.path.basename(fs.filename)}:{fs.lineno} in {fs.name}"
+                     for fs in traceback.extract_stack(frame, limit=40)]
+        coroutine = _running_coroutine(codes)
+        return {"beat": beat, "time": time.time(),
+                "coroutine": _code_label(coroutine) if coroutine is not None else None,
+                "blocked_in": _code_label(codes[0]) if codes else None, "stack": stack}
+
+    def _record(self, stall: dict, lag: float):
+        stall.pop("beat")
+        stall["lag_seconds"] = round(lag, 3)
+        loop_stalls.append(stall)
+        loop_health["stalls"] += 1
+        loop_stalls_total.inc()
+        print(f"WARNING: Event loop blocked for {lag:.2f}s in {stall['coroutine']} at {stall['blocked_in']}")
+        try:
+            if os.path.exists(LOOP_STALL_LOG) and os.path.getsize(LOOP_STALL_LOG) > LOOP_STALL_LOG_MAX_BYTES:
+                os.replace(LOOP_STALL_LOG, LOOP_STALL_LOG + ".1")
+            with open(LOOP_STALL_LOG, "a") as f:
+                f.write(json.dumps(stall) + "\n")
+        except IOError as e:
+            print(f"ERROR: Failed to write {LOOP_STALL_LOG}: {e}")
+
+    def stop(self):
+        self._stop_event.set()
+
+def start_loop_watchdog() -> asyncio.Task:
+    """Starts the heartbeat task and the watchdog thread for the running loop."""
+    global loop_watchdog
+    loop_watchdog = LoopWatchdog(threading.get_ident())
+    loop_watchdog.start()
+    return asyncio.create_task(loop_lag_monitor())
+
+def loop_health_report() -> dict:
+    recent = bool(loop_stalls) and time.time() - loop_stalls[-1]["time"] < LOOP_HEALTH_WINDOW
+    return {
+        "status": "degraded" if recent else "ok",
+        "discord_ready": client.is_ready(),
+        "list_loaded": list_loaded,
+        "loop_lag_seconds": round(loop_health["last_lag"], 4),
+        "max_loop_lag_seconds": round(loop_health["max_lag"], 4),
+        "loop_stall_threshold_seconds": LOOP_STALL_THRESHOLD,
+        "loop_stalls": loop_health["stalls"],
+        "last_loop_stall": loop_stalls[-1] if loop_stalls else None,
+    }
 
 # --- SLASH COMMANDS ---
 
+def _finish_command(interaction: discord.Interaction, status: str):
+    started_at = interaction.extras.pop("started_at", None)
+    if started_at is not None:
+        command_seconds.observe(time.perf_counter() - started_at, interaction.command.qualified_name, status)
+    root = interaction.extras.pop("trace", None)
+    if root is not None:
+        root.finish(status=status)
+
+@client.event
+async def on_app_command_completion(interaction: discord.Interaction, command):
+    _finish_command(interaction, "ok")
+
+@tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    _finish_command(interaction, "error")
+    await app_commands.CommandTree.on_error(tree, interaction, error)
+
 list_group = app_commands.Group(name="list", description="Admin commands for managing the unique list and bot state.")
 
 @list_group.command(name="restart", description="Forces a complete delete and re-create of the list messages.")
@@ -701,7 +2827,9 @@ async def list_restart(interaction: discord.Interaction):
 
     await interaction.response.defer(thinking=True)
     try:
-        await update_all_persistent_list_prompts(force_new=True)
+        error = await request_list_refresh(force_new=True)
+        if error:
+            raise error
         await interaction.followup.send("🔄 Bot list messages restarted and re-synced successfully. All old messages were deleted.")
     except Exception as e:
         await interaction.followup.send(f"❌ Restart failed: {e}")
@@ -719,70 +2847,57 @@ async def list_close(interaction: discord.Interaction):
     except Exception as e:
         await interaction.followup.send(f"❌ Close command failed: {e}")
 
+# Autocomplete runs on every keystroke; both lookups are a bisect into an index the
+# store keeps sorted, so they stay fast however long the list gets.
+async def item_autocomplete(interaction: discord.Interaction, current: str):
+    return [app_commands.Choice(name=item[:100], value=item[:100]) for item in list_store.complete_items(current)]
+
+async def owner_autocomplete(interaction: discord.Interaction, current: str):
+    return [app_commands.Choice(name=owner[:100], value=owner[:100]) for owner in list_store.complete_owners(current)]
+
 @list_group.command(name="add", description="Manually adds or updates a list item.")
 @app_commands.describe(
     item="The name of the unique item.",
     name="The player's name.",
     cost="The cost count. Defaults to 1 or increments if item exists."
 )
+@app_commands.autocomplete(item=item_autocomplete, name=owner_autocomplete)
 async def list_add(interaction: discord.Interaction, item: str, name: str, cost: app_commands.Range[int, 1] = None):
     if not is_admin(interaction.user.id):
         await interaction.response.send_message("❌ Access Denied. You must be a bot admin to use this command.", ephemeral=True)
         return
 
     await interaction.response.defer(thinking=True)
-    global data_list
-    found_idx = -1
-    final_cost = str(cost) if cost is not None else "1"
-    resp = ""
-
-    for i, r in enumerate(data_list):
-        if r[0].lower() == item.lower():
-            found_idx = i
-            break
-
-    current_time_epoch = time.time()
-
-    if found_idx != -1:
-        row_to_update = data_list.pop(found_idx)
-        row_to_update[1] = name
-        if cost is None:
-            try:
-                final_cost = str(int(row_to_update[2]) + 1)
-            except:
-                final_cost = "1"
-        row_to_update[2] = final_cost
-        row_to_update[3] = current_time_epoch
-        data_list.append(row_to_update)
-        resp = f"✅ Updated Item **'{item}'**. Name:'{name}', Cost:{final_cost}."
-    else:
-        new_row = [item, name, final_cost, current_time_epoch]
-        data_list.append(new_row)
+    with span("store.upsert"):
+        row, created = list_store.upsert(item, name, cost)
+    final_cost = row.cost
+    if created:
         resp = f"✅ Added Item **'{item}'**. Name:'{name}', Cost:{final_cost}."
+    else:
+        resp = f"✅ Updated Item **'{item}'**. Name:'{name}', Cost:{final_cost}."
 
     _update_last_changed_details(item, name, final_cost)
-    save_data_list()
-    await update_all_persistent_list_prompts()
+    request_save()
+    await request_list_refresh()
     await interaction.followup.send(resp)
 
 @list_group.command(name="delete", description="Deletes a unique item from the list by name.")
 @app_commands.describe(item="The name of the unique item to delete.")
+@app_commands.autocomplete(item=item_autocomplete)
 async def list_delete(interaction: discord.Interaction, item: str):
     if not is_admin(interaction.user.id):
         await interaction.response.send_message("❌ Access Denied. You must be a bot admin to use this command.", ephemeral=True)
         return
 
     await interaction.response.defer(thinking=True)
-    global data_list
-    original_len = len(data_list)
-    data_list = [r for r in data_list if r[0].lower() != item.lower()]
-
-    if len(data_list) < original_len:
+    with span("store.delete"):
+        removed = list_store.delete(item)
+    if removed is not None:
         if last_updated_item_details.get("item_val") and \
            last_updated_item_details["item_val"].lower() == item.lower():
             _update_last_changed_details(None, None, None)
-        save_data_list()
-        await update_all_persistent_list_prompts()
+        request_save()
+        await request_list_refresh()
         await interaction.followup.send(f"✅ Item **'{item}'** deleted.")
     else:
         await interaction.followup.send(f"❓ Item **'{item}'** not found.")
@@ -796,7 +2911,7 @@ async def list_announce(interaction: discord.Interaction):
     await interaction.response.defer(thinking=True)
     item, name, cost = last_updated_item_details.get("item_val"), last_updated_item_details.get("name_val"), last_updated_item_details.get("cost_val")
     if item and name and cost is not None:
-        await send_custom_update_notifications(item, name, cost)
+        await asyncio.gather(*send_custom_update_notifications(item, name, cost), return_exceptions=True)
         await interaction.followup.send(f"📢 Re-announced last update: Item: **{item}**, Name: **{name}**, Cost: **{cost}**.")
     else:
         await interaction.followup.send("❓ No recent update (with cost) to announce.")
@@ -809,20 +2924,17 @@ async def list_say(interaction: discord.Interaction, message: str):
         return
 
     await interaction.response.defer(thinking=True)
-    sent_to_channels = []
+    deliveries = []
 
     for cfg in UPDATE_NOTIFICATION_CONFIG:
         cid = cfg.get("channel_id")
         if not cid or cid == 0: continue
         chan = client.get_channel(cid)
         if not chan: continue
+        deliveries.append((chan.name if hasattr(chan, 'name') else str(cid), notification_dispatcher.send(cid, content=message)))
 
-        try:
-            await chan.send(message)
-            sent_to_channels.append(chan.name if hasattr(chan, 'name') else str(cid))
-        except:
-            pass
-        await asyncio.sleep(0.5)
+    results = await asyncio.gather(*(future for _, future in deliveries), return_exceptions=True)
+    sent_to_channels = [name for (name, _), result in zip(deliveries, results) if not isinstance(result, Exception)]
 
     if sent_to_channels:
         await interaction.followup.send(f"✅ Your message was sent to: {', '.join(sent_to_channels)}.")
@@ -880,12 +2992,11 @@ async def list_raw(interaction: discord.Interaction):
         return
 
     await interaction.response.defer(thinking=True)
-    global data_list
-    if not data_list:
-        await interaction.followup.send("`data_list` is empty.")
+    if not list_store:
+        await interaction.followup.send("The list is empty.")
         return
 
-    raw_json = json.dumps(data_list, indent=2)
+    raw_json = json.dumps([row.to_json() for row in list_store], indent=2)
     MAX_CONTENT_CHUNK_SIZE = MAX_MESSAGE_LENGTH - 150
     chunks = []
     i = 0
@@ -905,6 +3016,177 @@ async def list_raw(interaction: discord.Interaction):
             await interaction.channel.send(msg_content)
         await asyncio.sleep(0.5)
 
+RECENT_WINDOW_REGEX = re.compile(r"^\s*(\d+)\s*([mhdw])\s*$", re.IGNORECASE)
+RECENT_WINDOW_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": SECONDS_IN_WEEK}
+
+def parse_recent_window(window: str) -> int:
+    """Turns a window such as "90m", "24h", "7d" or "2w" into seconds."""
+    match = RECENT_WINDOW_REGEX.match(window)
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Invalid window `{window}`. Use a number followed by m, h, d or w, e.g. 24h, 7d or 30d.")
+    return int(match.group(1)) * RECENT_WINDOW_UNITS[match.group(2).lower()]
+
+@list_group.command(name="recent", description="Shows the items updated within a time window.")
+@app_commands.describe(window="How far back to look, e.g. 24h, 7d or 30d (default 7d).")
+async def list_recent(interaction: discord.Interaction, window: str = "7d"):
+    try:
+        seconds = parse_recent_window(window)
+    except ValueError as ve:
+        await interaction.response.send_message(f"❌ {ve}", ephemeral=True)
+        return
+
+    window = window.strip().lower()
+    rows = list_store.recent_rows(time.time() - seconds)
+    if not rows:
+        await interaction.response.send_message(f"No items have been updated in the last {window}.", ephemeral=True)
+        return
+
+    parts = format_list_for_display(rows, [0, 1, 2], ["Item", "Name", f"Cost ({window})"])
+    header = f"**{len(rows)} items updated in the last {window}** (newest first)"
+    for i, part in enumerate(parts):
+        part_header = f"{header} | Part {i+1}/{len(parts)}" if len(parts) > 1 else header
+        content = f"{part_header}\n```\n{part}\n```"
+        if i == 0:
+            await interaction.response.send_message(content, ephemeral=True)
+        else:
+            await interaction.followup.send(content, ephemeral=True)
+
+@list_group.command(name="player", description="Shows how many uniques a player owns and which ones.")
+@app_commands.describe(name="The player name (not case-sensitive).")
+@app_commands.autocomplete(name=owner_autocomplete)
+async def list_player(interaction: discord.Interaction, name: str):
+    rows = list_store.owner_rows(name.strip())
+    if not rows:
+        await interaction.response.send_message(f"**{name}** does not own any uniques.", ephemeral=True)
+        return
+
+    rank = list_store.owner_rank(name.strip())
+    header = (f"**{rows[0][1]}** owns {len(rows)} uniques "
+              f"(#{rank} of {list_store.owner_total()} owners)")
+    parts = format_list_for_display(rows, [0, 2], ["Item", "Cost"])
+    for i, part in enumerate(parts):
+        part_header = f"{header} | Part {i+1}/{len(parts)}" if len(parts) > 1 else header
+        content = f"{part_header}\n```\n{part}\n```"
+        if i == 0:
+            await interaction.response.send_message(content, ephemeral=True)
+        else:
+            await interaction.followup.send(content, ephemeral=True)
+
+@list_group.command(name="stats", description="Shows internal performance counters of the bot.")
+async def list_stats(interaction: discord.Interaction):
+    if not is_admin(interaction.user.id):
+        await interaction.response.send_message("❌ Access Denied. You must be a bot admin to use this command.", ephemeral=True)
+        return
+
+    cache = render_cache.stats()
+    dispatch = notification_dispatcher.stats
+    codes = server_code_cache.stats
+    poll = server_code_poller.stats
+    poll_age = server_code_poller.snapshot_age()
+    poll_line = (
+        f"{poll['polls']} polls, last took {poll['last_poll_seconds']:.2f}s, {poll['errors']} upstream errors, "
+        f"snapshot age {poll_age:.0f}s" if poll_age is not None else "no snapshot"
+    ) if SERVER_CODES_POLL_INTERVAL > 0 else "disabled"
+    avg_latency = dispatch["latency_total"] / dispatch["delivered"] if dispatch["delivered"] else 0.0
+    lines = [
+        f"**List:** {len(list_store)} items, {list_store.owner_total()} owners (version {list_store.version}), "
+        f"storage `{PERSISTENCE_MODE}`",
+        f"**Saves:** {persistence_stats['save_requests']} requested, {persistence_stats['coalesced']} coalesced, "
+        f"{persistence_stats['writes']} written",
+        f"**Render cache:** {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%}), "
+        f"{cache['entries']} entries",
+        f"**List syncs:** {list_sync_stats['syncs']} syncs, {list_sync_stats['api_calls']} API calls, "
+        f"{list_sync_stats['api_calls_saved']} saved, {list_sync_stats['parts_skipped']} unchanged parts skipped",
+        *(
+            f"- <#{cid}> last sync: {last['api_calls']} API calls, {last['api_calls_saved']} saved, "
+            f"{last['skipped']}/{last['parts']} parts skipped" + (f", {last['failed']} failed" if last['failed'] else "")
+            for cid, last in list_sync_stats["last_sync"].items()
+        ),
+        f"**Refreshes:** {list_refresh_scheduler.stats['requests']} requested, "
+        f"{list_refresh_scheduler.stats['coalesced']} coalesced, {list_refresh_scheduler.stats['syncs']} syncs run, "
+        f"{list_refresh_scheduler.stats['retries']} retried after a failure, last took {list_sync_stats['last_refresh_seconds']:.2f}s for {list_sync_stats['last_refresh_channels']} channels"
+        + (f", {list_refresh_scheduler.stats['failures_in_a_row']} failed in a row "
+           f"(next retry after {list_refresh_scheduler.retry_delay():.0f}s)" if list_refresh_scheduler.stats['failures_in_a_row'] else ""),
+        *(f"- <#{cid}> skipped, not accessible: `{error}`" for cid, error in unreachable_list_channels.items()),
+        f"**REST:** {rest_pacer.stats['requests']} requests, {rest_pacer.stats['rate_limited']} rate limited (429), "
+        f"{rest_pacer.stats['paced_seconds']:.1f}s spent waiting for buckets",
+        f"**Notifications:** {notification_dispatcher.queue_depth()} queued, {dispatch['delivered']} delivered, "
+        f"{dispatch['failed']} failed, {dispatch['retries']} retries, "
+        f"latency avg {avg_latency:.2f}s / max {dispatch['latency_max']:.2f}s",
+        f"**Server codes:** {codes['hits']} hits, {codes['stale_hits']} stale hits, {codes['misses']} misses, "
+        f"{codes['fetches']} upstream fetches, {codes['errors']} errors",
+        f"**Server code poller:** {poll_line}",
+        f"**Event loop:** lag {loop_health['last_lag'] * 1000:.0f} ms (max {loop_health['max_lag'] * 1000:.0f} ms), "
+        f"{loop_health['stalls']} stalls over {LOOP_STALL_THRESHOLD}s"
+        + (f", last {loop_stalls[-1]['lag_seconds']:.2f}s in `{loop_stalls[-1]['coroutine']}`" if loop_stalls else ""),
+    ]
+    await interaction.response.send_message("\n".join(lines), ephemeral=True)
+
+@list_group.command(name="traces", description="Shows where the time of recent commands, clicks and forges went.")
+@app_commands.describe(
+    name="Only traces whose name contains this, e.g. 'add', 'button' or 'forge'.",
+    slowest="Show the slowest buffered traces instead of the latest."
+)
+async def list_traces(interaction: discord.Interaction, name: str = None, slowest: bool = False):
+    if not is_admin(interaction.user.id):
+        await interaction.response.send_message("❌ Access Denied. You must be a bot admin to use this command.", ephemeral=True)
+        return
+
+    own_trace = interaction.extras.get("trace")
+    traces = [t for t in trace_buffer if t is not own_trace and (not name or name.lower() in t.name.lower())]
+    if not traces:
+        await interaction.response.send_message("No matching traces are buffered.", ephemeral=True)
+        return
+    if slowest:
+        traces.sort(key=lambda t: t.duration or 0.0, reverse=True)
+    else:
+        traces.reverse()
+
+    budget = MAX_MESSAGE_LENGTH - 100
+    blocks = []
+    for t in traces:
+        block = format_trace(t)
+        if blocks and sum(len(b) + 2 for b in blocks) + len(block) > budget:
+            break
+        blocks.append(block[:budget])
+    await interaction.response.send_message(
+        f"**Traces:** {len(blocks)} of {len(traces)} matching ({len(trace_buffer)} buffered)\n"
+        f"```\n" + "\n\n".join(blocks) + "\n```",
+        ephemeral=True
+    )
+
+@list_group.command(name="profile", description="Profiles the running bot for a few seconds and attaches the report.")
+@app_commands.describe(
+    seconds=f"How long to profile (at most {PROFILE_MAX_SECONDS}s).",
+    mode="Sampling barely slows the bot down; cProfile is exact but slows it while it runs."
+)
+@app_commands.choices(mode=[
+    app_commands.Choice(name="Sampling", value="sampling"),
+    app_commands.Choice(name="cProfile", value="cprofile"),
+])
+async def list_profile(interaction: discord.Interaction, seconds: app_commands.Range[int, 1, PROFILE_MAX_SECONDS],
+                       mode: app_commands.Choice[str] = None):
+    if not is_admin(interaction.user.id):
+        await interaction.response.send_message("❌ Access Denied. You must be a bot admin to use this command.", ephemeral=True)
+        return
+
+    if _profile_lock.locked():
+        await interaction.response.send_message("⚠️ A profile is already running.", ephemeral=True)
+        return
+    # An unlocked asyncio.Lock is taken without yielding, so no other call gets past the check first.
+    await _profile_lock.acquire()
+    try:
+        mode_value = mode.value if mode else "sampling"
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        report = await run_profile(seconds, mode_value)
+    finally:
+        _profile_lock.release()
+    await interaction.followup.send(
+        f"✅ Profiled the bot for {seconds}s ({mode_value}).",
+        file=discord.File(io.BytesIO(report.encode()), filename=f"profile-{int(time.time())}.txt"),
+        ephemeral=True
+    )
+
 @list_group.command(
     name="importjson",
     description="Imports a complete JSON array into the list (replaces current data) and shows changes."
@@ -919,7 +3201,6 @@ async def list_importjson(interaction: discord.Interaction, json_data: str):
 
     await interaction.response.defer(thinking=True)
 
-    global data_list
     try:
         loaded = json.loads(json_data)
         if not isinstance(loaded, list):
@@ -929,47 +3210,43 @@ async def list_importjson(interaction: discord.Interaction, json_data: str):
         for idx, row in enumerate(loaded):
             if not isinstance(row, list) or len(row) < 3:
                 raise ValueError(f"Row {idx} is invalid. Each row must be a list of at least 3 elements: [Item, Name, Cost].")
-            row[2] = str(row[2])
             if len(row) < 4:
                 row.append(int(time.time()))
 
-        # Maak overzicht van huidige eigenaars
-        old_owners = {item[0]: item[1] for item in data_list}
-        old_counts = {}
-        for owner in [item[1] for item in data_list]:
-            old_counts[owner] = old_counts.get(owner, 0) + 1
-
-        # Update data_list
-        data_list = loaded
-        save_data_list()
-        await update_all_persistent_list_prompts(force_new=True)
-
-        # Nieuw overzicht van eigenaars
-        new_owners = {item[0]: item[1] for item in data_list}
-        new_counts = {}
-        for owner in [item[1] for item in data_list]:
-            new_counts[owner] = new_counts.get(owner, 0) + 1
+        # Previous owner of every imported item, looked up in the store instead of rescanning it.
+        # Duplicate items keep the last row, as replace() does.
+        new_owners = {}
+        old_owners = {}
+        for row in loaded:
+            key = row[0].lower()
+            old_row = list_store.get(row[0])
+            new_owners[key] = (row[0], row[1])
+            old_owners.setdefault(key, old_row.name if old_row else None)
 
         # Bepaal wijzigingen
         changes = []
-        for item_name, new_owner in new_owners.items():
-            old_owner = old_owners.get(item_name)
-            if old_owner != new_owner:
-                changes.append(f"{item_name} → {old_owner} -> {new_owner}")
-
-        # Update counts only for affected users
         affected_users = set()
-        for item_name, new_owner in new_owners.items():
-            old_owner = old_owners.get(item_name)
+        for key, (item_name, new_owner) in new_owners.items():
+            old_owner = old_owners[key]
             if old_owner != new_owner:
+                changes.append(f"{item_name} → {old_owner} -> {new_owner}")
                 affected_users.add(new_owner)
                 if old_owner:
                     affected_users.add(old_owner)
 
+        # Owner tallies come from the store's owner index, before and after the import.
+        old_counts = {user: list_store.owner_count(user) for user in affected_users}
+
+        # Update the list
+        with span("store.replace", rows=len(loaded)):
+            list_store.replace(loaded)
+        request_save()
+        await request_list_refresh(force_new=True)
+
         counts_changes = []
         for user in affected_users:
-            old_count = old_counts.get(user, 0)
-            new_count = new_counts.get(user, 0)
+            old_count = old_counts[user]
+            new_count = list_store.owner_count(user)
             if old_count != new_count:
                 counts_changes.append(f"{user} : {old_count} uniques -> {new_count} uniques")
 
@@ -989,6 +3266,83 @@ async def list_importjson(interaction: discord.Interaction, json_data: str):
     except Exception as e:
         await interaction.followup.send(f"Unexpected error: {e}")
 
+@list_group.command(
+    name="backfill",
+    description="Rebuilds the list from the forge bot's messages in a channel's history."
+)
+@app_commands.describe(
+    channel_id="The ID of the channel the forge bot posts in.",
+    mode="Rebuild replaces the list, reconcile only adds newer or higher counts.",
+    resume="Continue the previous, interrupted backfill from its checkpoint."
+)
+@app_commands.choices(mode=[
+    app_commands.Choice(name="Rebuild", value="rebuild"),
+    app_commands.Choice(name="Reconcile", value="reconcile"),
+])
+async def list_backfill(interaction: discord.Interaction, channel_id: str, mode: app_commands.Choice[str], resume: bool = False):
+    if not is_admin(interaction.user.id):
+        await interaction.response.send_message("❌ Access Denied. You must be a bot admin to use this command.", ephemeral=True)
+        return
+
+    if not channel_id.isdigit():
+        await interaction.response.send_message("❌ Channel ID must be a valid numerical ID.", ephemeral=True)
+        return
+
+    if _backfill_lock.locked():
+        await interaction.response.send_message("⚠️ A backfill is already running.", ephemeral=True)
+        return
+    # Taken before the first await (see list_profile), so a second call is rejected above.
+    await _backfill_lock.acquire()
+    try:
+        checkpoint = None
+        if resume:
+            checkpoint = load_backfill_checkpoint()
+            if not checkpoint or checkpoint.get("channel_id") != int(channel_id):
+                await interaction.response.send_message("❌ There is no backfill checkpoint for this channel.", ephemeral=True)
+                return
+            if checkpoint.get("mode") != mode.value:
+                await interaction.response.send_message(
+                    f"❌ The interrupted backfill ran in `{checkpoint.get('mode')}` mode. "
+                    f"Resume it with that mode, or start a new `{mode.value}` run without `resume`.", ephemeral=True)
+                return
+
+        await interaction.response.defer(thinking=True)
+
+        channel = client.get_channel(int(channel_id))
+        if channel is None:
+            try:
+                channel = await client.fetch_channel(int(channel_id))
+            except discord.HTTPException:
+                await interaction.followup.send(f"❌ Channel not found or not accessible: `{channel_id}`")
+                return
+
+        async def report(line: str):
+            # The interaction token expires after 15 minutes; long runs keep going without progress.
+            try:
+                await interaction.edit_original_response(content=line)
+            except discord.HTTPException:
+                pass
+
+        async def progress(state: dict):
+            print(f"Backfill of channel {channel.id}: {_backfill_progress_line(state)}")
+            await report(f"⏳ Backfilling <#{channel.id}>: {_backfill_progress_line(state)}")
+
+        try:
+            result = await run_history_backfill(channel, mode.value, checkpoint, progress)
+        except discord.Forbidden:
+            await report(f"❌ I cannot read the message history of <#{channel.id}>.")
+            return
+        except Exception as e:
+            await report(f"❌ Backfill stopped: `{e}`. Run it again with `resume` to continue from the checkpoint.")
+            return
+    finally:
+        _backfill_lock.release()
+
+    await report(
+        f"✅ Backfill ({result['mode']}) of <#{channel.id}> finished: {_backfill_progress_line(result)}. "
+        f"{result['changed']} items written."
+    )
+
 @list_group.command(
     name="announce_specific",
     description="Announces a specific item update to the configured channels."
@@ -1012,6 +3366,7 @@ async def list_announce_specific(
     await interaction.response.defer(thinking=True)
 
     # Loop over de UPDATE_NOTIFICATION_CONFIG om in elk kanaal te posten
+    deliveries = []
     for cfg in UPDATE_NOTIFICATION_CONFIG:
         cid, fmt, rid = cfg.get("channel_id"), cfg.get("message_format"), cfg.get("role_id_to_ping")
         if not cid or not fmt or cid == 0:
@@ -1027,17 +3382,15 @@ async def list_announce_specific(
             role_mention = role.mention if role else ""
 
         # format message exactly like: Item - Name - Cost\n@Role
-        try:
-            embed = discord.Embed(
-                title=f"The Unique {item} has been forged by {name}!",
-                description=f"{role_mention} A moderator just announced a forge.",
-                color=0xFF4444
-            )
-            embed.set_footer(text="florrForge 27.1 beta 3")
-            await chan.send(embed=embed)
-        except Exception:
-            pass
+        embed = discord.Embed(
+            title=f"The Unique {item} has been forged by {name}!",
+            description=f"{role_mention} A moderator just announced a forge.",
+            color=0xFF4444
+        )
+        embed.set_footer(text="florrForge 27.1 beta 3")
+        deliveries.append(notification_dispatcher.send(cid, embed=embed))
 
+    await asyncio.gather(*deliveries, return_exceptions=True)
     await interaction.followup.send(
         f"📢 Specific announcement sent: **{item} - {name}**"
     )
@@ -1056,31 +3409,15 @@ async def list_report(interaction: discord.Interaction):
 @list_group.command(name="server_codes", description="Show server codes for a specific map.")
 @app_commands.describe(map="Choose a map.")
 @app_commands.choices(map=[
-    app_commands.Choice(name="Garden", value=0),
-    app_commands.Choice(name="Desert", value=1),
-    app_commands.Choice(name="Ocean", value=2),
-    app_commands.Choice(name="Jungle", value=3),
-    app_commands.Choice(name="Ant Hell", value=4),
-    app_commands.Choice(name="Hel", value=5),
-    app_commands.Choice(name="Sewers", value=6),
-    app_commands.Choice(name="Factory", value=7),
-    app_commands.Choice(name="Pyramid", value=8),
-    app_commands.Choice(name="Ant hell", value=9),
+    app_commands.Choice(name=map_name, value=map_id) for map_id, map_name in enumerate(SERVER_CODE_MAP_NAMES)
 ])
 async def green(interaction: discord.Interaction, map: app_commands.Choice[int]):
     await interaction.response.defer()
 
-    api_url = BASE_URL.format(map.value)
-
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(api_url, timeout=10) as response:
-                if response.status != 200:
-                    await interaction.followup.send(f"API error (HTTP {response.status})", ephemeral=True)
-                    return
-                data = await response.json()
-    except Exception as e:
-        await interaction.followup.send(f"API request failed:\n```{e}```", ephemeral=True)
+        data = await server_code_cache.get(map.value)
+    except ServerCodeError as e:
+        await interaction.followup.send(str(e), ephemeral=True)
         return
 
     servers = data.get("servers", {})
@@ -1088,13 +3425,6 @@ async def green(interaction: discord.Interaction, map: app_commands.Choice[int])
         await interaction.followup.send(f"No active servers found for {map.name}.", ephemeral=True)
         return
 
-    # Regio mapping op basis van naam
-    REGION_LABELS = {
-        "miami": "🇺🇸 US",
-        "frankfurt": "🇪🇺 EU",
-        "tokyo": "🌏 AS",
-    }
-
     embed = discord.Embed(
         title=f"{map.name} Server Codes",
         color=discord.Color.green()
@@ -1105,8 +3435,7 @@ async def green(interaction: discord.Interaction, map: app_commands.Choice[int])
         if not server_id:
             continue
 
-        # Zoek regio label op basis van sleutelwoord in server_key
-        region = next((label for keyword, label in REGION_LABELS.items() if keyword in server_key), f"🌐 {server_key}")
+        region = _region_label(server_key)
 
         join_code = format_join_code(server_id)
 
@@ -1119,6 +3448,35 @@ async def green(interaction: discord.Interaction, map: app_commands.Choice[int])
     embed.set_footer(text=f"florrForge {VERSION}")
     await interaction.followup.send(embed=embed)
 
+@list_group.command(name="server_codes_all", description="Show the server codes of every map at once.")
+async def green_all(interaction: discord.Interaction):
+    await interaction.response.defer()
+
+    # Maps the poller has not cached yet (or a cold start without poller) are fetched now, concurrently.
+    results = await asyncio.gather(
+        *(server_code_cache.get(map_id) for map_id in range(len(SERVER_CODE_MAP_NAMES))),
+        return_exceptions=True
+    )
+
+    embed = discord.Embed(title="Server Codes: All Maps", color=discord.Color.green())
+    for map_name, data in zip(SERVER_CODE_MAP_NAMES, results):
+        if isinstance(data, Exception):
+            value = "API unavailable"
+        else:
+            lines = [
+                f"{_region_label(server_key)}: `{server_info.get('id')}`"
+                for server_key, server_info in data.get("servers", {}).items() if server_info.get("id")
+            ]
+            value = "\n".join(lines) if lines else "No active servers"
+        embed.add_field(name=map_name, value=value, inline=True)
+
+    age = server_code_poller.snapshot_age()
+    footer = f"florrForge {VERSION}"
+    if age is not None:
+        footer += f" | Snapshot age: {age:.0f}s"
+    embed.set_footer(text=footer)
+    await interaction.followup.send(embed=embed)
+
 @list_group.command(
     name="announce_version",
     description="Manually triggers a version announcement in the configured VERSION_CHANNEL_ID."
@@ -1232,6 +3590,10 @@ async def on_ready():
 
     print(f'{client.user.name} ({client.user.id}) connected!')
 
+    # Load before the slow command sync, so forges and commands don't hit an unloaded list.
+    print("Loading data and persistent message IDs from file...")
+    load_data_list()
+
     tree.add_command(list_group)
 
     print("Syncing slash commands...")
@@ -1241,9 +3603,6 @@ async def on_ready():
     except Exception as e:
         print(f"Failed to sync slash commands: {e}")
 
-    print("Loading data and persistent message IDs from file...")
-    load_data_list()
-
     print("Initializing channel states and updating persistent list prompts.")
     for cid in INTERACTIVE_LIST_TARGET_CHANNEL_IDS:
         if cid == 0 or not isinstance(cid, int):
@@ -1251,7 +3610,7 @@ async def on_ready():
         if cid not in channel_list_states:
             channel_list_states[cid] = {"message_ids": [], "default_sort_key_for_display": DEFAULT_PERSISTENT_SORT_KEY}
 
-    await update_all_persistent_list_prompts(force_new=False)
+    await request_list_refresh()
 
     try:
         await check_and_announce_version()
@@ -1271,42 +3630,82 @@ async def on_ready():
     except Exception:
         pass
 
+# One precompiled pass over the lowercased message instead of a substring scan per trigger.
+# (Matching the lowercased text is cheaper than an IGNORECASE pattern over the raw content.)
+TRIGGER_PATTERN = re.compile("|".join(re.escape(trigger.lower()) for trigger in TRIGGERS))
+FUN_FACT_CHANCE = 0.01
+_background_tasks = set()
+
+def _spawn(coro):
+    """Runs a fire-and-forget coroutine off the message hot path, keeping a reference until done."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def _add_trigger_reaction(m: discord.Message):
+    try:
+        await m.add_reaction(EMOJI)
+    except Exception as e:
+        print("Reaction failed:", e)
+
+async def _send_fun_fact(channel):
+    try:
+        await channel.send("Fun fact: Manfred is p2w")
+    except Exception as e:
+        print("Fun fact failed:", e)
+
+def _handle_forge_message(m: discord.Message) -> bool:
+    """Applies a forge-bot announcement to the list. Returns True if the message was one."""
+    match = AUTO_UPDATE_MESSAGE_REGEX.search(m.content)
+    if not match:
+        return False
+    item_val, name_val = match.group(1).strip(), match.group(2).strip()
+    with trace("forge message", item=item_val):
+        updated_cost = update_data_for_auto(item_val, name_val)
+        request_list_refresh()
+        send_custom_update_notifications(item_val, name_val, updated_cost)
+    return True
+
 @client.event
 async def on_message(m: discord.Message):
     """
-    Handles only the auto-update logic.
+    Handles the auto-update logic first, then the cheap trigger reactions.
     Note: Since the message is from another bot (TARGET_BOT_ID_FOR_AUTO_UPDATES),
     the message content is accessible without the privileged message_content intent.
     """
-    if m.author == client.user:
+    if m.author.id == TARGET_BOT_ID_FOR_AUTO_UPDATES:
+        _handle_forge_message(m)
+    elif m.author == client.user:
         return
-    content = m.content.lower()
-    if any(trigger in content for trigger in TRIGGERS):
-        try:
-            await m.add_reaction(EMOJI)
-        except Exception as e:
-            print("Reaction failed:", e)
 
-    if random.randint(1, 100) == 1:
-        await m.channel.send("Fun fact: Manfred is p2w")
-    # ↑ TOT HIER
+    content = m.content
+    if content and TRIGGER_PATTERN.search(content.lower()):
+        _spawn(_add_trigger_reaction(m))
 
-    # bestaande code blijft hieronder staan
-    # Check for the target bot's automated message
-    if m.author.id == TARGET_BOT_ID_FOR_AUTO_UPDATES:
-        match = AUTO_UPDATE_MESSAGE_REGEX.search(m.content)
-        if match:
-            item_val, name_val = match.group(1).strip(), match.group(2).strip()
-            updated_cost = update_data_for_auto(item_val, name_val)
-            await update_all_persistent_list_prompts(force_new=False)
-            await send_custom_update_notifications(item_val, name_val, updated_cost)
-            return
+    if random.random() < FUN_FACT_CHANCE:
+        _spawn(_send_fun_fact(m.channel))
 
 # --- WEB SERVER AND MAIN EXECUTION ---
 
+def _debug_authorized(request) -> bool:
+    supplied = request.query.get("token") or request.headers.get("Authorization", "").removeprefix("Bearer ")
+    return bool(DEBUG_TOKEN) and hmac.compare_digest(supplied.encode(), DEBUG_TOKEN.encode())
+
+async def debug_traces(request):
+    """The buffered traces as JSON, oldest first; ?name= filters like /list traces."""
+    if not _debug_authorized(request):
+        raise aiohttp.web.HTTPNotFound()
+    name = request.query.get("name", "").lower()
+    return aiohttp.web.json_response([t.to_json() for t in trace_buffer if name in t.name.lower()])
+
 async def web_server():
     app = aiohttp.web.Application()
     app.router.add_get("/", lambda r: aiohttp.web.Response(text="Bot is running!"))
+    app.router.add_get("/metrics", lambda r: aiohttp.web.Response(
+        body=render_metrics().encode(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}))
+    app.router.add_get("/health", lambda r: aiohttp.web.json_response(loop_health_report()))
+    app.router.add_get("/debug/traces", debug_traces)
     runner = aiohttp.web.AppRunner(app)
     await runner.setup()
     port = int(os.environ.get("PORT", 8080))
@@ -1329,10 +3728,20 @@ async def main():
         pass
 
     web_task = asyncio.create_task(web_server())
+    lag_task = start_loop_watchdog()
+    start_persistence_writer()
+    server_code_cache.start()
+    server_code_poller.start()
     try:
         await client.start(BOT_TOKEN)
     finally:
         web_task.cancel()
+        lag_task.cancel()
+        loop_watchdog.stop()
+        await server_code_cache.close()
+        # Waits for a write the persistence writer has in flight before the last flush.
+        await flush_saves()
+        persistence_task.cancel()
 
 async def check_and_announce_version():
     # 1. Channel resolven (cache → fetch fallback)
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import list_bot as _list_bot  # noqa: E402
+
+
+@pytest.fixture
+def list_bot(tmp_path, monkeypatch):
+    """list_bot with an empty, unloaded store, writing its files into a scratch directory."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(_list_bot, "list_store", _list_bot.ListStore())
+    monkeypatch.setattr(_list_bot, "list_loaded", False)
+    monkeypatch.setattr(_list_bot, "channel_list_states", {})
+    monkeypatch.setattr(_list_bot, "view_message_tracker", {})
+    monkeypatch.setattr(_list_bot, "render_cache", _list_bot.RenderCache())
+    monkeypatch.setattr(_list_bot, "_list_pages_cache", {})
+    monkeypatch.setattr(_list_bot, "list_sync_stats", {**_list_bot.list_sync_stats, "last_sync": {}})
+    monkeypatch.setattr(_list_bot, "unreachable_list_channels", {})
+    return _list_bot
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from benchmarks import make_rows
+
+
+def _body(content):
+    """A rendered part without its timestamp and page header."""
+    return content.split("\n", 1)[1]
+
+
+@pytest.mark.parametrize("sort_key", ["sort_config_item", "sort_config_name"])
+def test_pages_match_full_list_and_follow_mutations(list_bot, sort_key):
+    list_bot.list_store.replace(make_rows(2_000))
+
+    async def run():
+        full = await list_bot.render_list_content(sort_key, is_ephemeral=True)
+        pages = [await list_bot.render_list_page(sort_key, page) for page in range(len(full))]
+        again = await list_bot.render_list_page(sort_key, 1)
+        # The first row of the view moves away or changes its name, so page 1 changes.
+        first = list_bot.list_store.sorted_rows(list_bot.SORT_CONFIGS[sort_key]["store_view"])[0]
+        list_bot.list_store.upsert(first.item, "Zz Forger")
+        changed = await list_bot.render_list_page(sort_key, 0)
+        return full, pages, again, changed, await list_bot.render_list_content(sort_key, is_ephemeral=True)
+
+    full, pages, again, changed, full_after = asyncio.run(run())
+    assert len(full) > 2
+    assert [_body(content) for content, _, _ in pages] == [_body(part) for part in full]
+    assert again == pages[1]
+    assert _body(changed[0]) != _body(pages[0][0])
+    assert _body(changed[0]) == _body(full_after[0])
+
+
+def test_sqlite_render_reads_unsaved_changes_without_flushing(list_bot, monkeypatch):
+    monkeypatch.setattr(list_bot, "PERSISTENCE_MODE", "sqlite")
+    monkeypatch.setattr(list_bot, "list_loaded", True)
+
+    async def no_flush():
+        raise AssertionError("rendering must not force a save")
+
+    monkeypatch.setattr(list_bot, "flush_saves", no_flush)
+    list_bot.list_store.replace(make_rows(50))
+    list_bot.list_store.upsert("Item Unsaved", "Forger")
+
+    content = asyncio.run(list_bot.render_list_content("sort_config_item"))
+    assert "Item Unsaved" in "".join(content)
@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+BAD_ROWS = [
+    ["Item A", "Ann", "3", 1700000000],
+    ["Item B", "Bob", "x", "not a time"],
+    ["Item C", "Cid", None, None],
+    ["Item D", "Dee", "-2", "1700000100.5"],
+    ["Item E", "Eve", "5", [1]],
+    ["Item F", 42, "1", float("nan")],
+    ["Item G", "Gus"],
+    ["Item H", "Hal", 4, {}],
+]
+
+
+def test_from_json_falls_back_to_zero():
+    from list_bot import ListRow
+
+    rows = ListRow.from_json_rows(BAD_ROWS)
+    assert [(r.item, r.name, r.cost, r.timestamp) for r in rows] == [
+        ("Item A", "Ann", 3, 1700000000.0),
+        ("Item B", "Bob", 0, 0.0),
+        ("Item C", "Cid", 0, 0.0),
+        ("Item D", "Dee", -2, 1700000100.5),
+        ("Item E", "Eve", 5, 0.0),
+        ("Item F", "42", 1, 0.0),
+        ("Item G", "Gus", 0, 0.0),
+        ("Item H", "Hal", 4, 0.0),
+    ]
+    assert rows == [ListRow.from_json(row) for row in BAD_ROWS]
+
+
+def test_bad_rows_load_from_data_file(list_bot, monkeypatch):
+    monkeypatch.setattr(list_bot, "PERSISTENCE_MODE", "json")
+    with open(list_bot.DATA_FILE, "w") as f:
+        # NaN is not JSON, but Python's json module writes and reads it.
+        json.dump({"list_data": BAD_ROWS, "state_data": {}}, f)
+
+    list_bot.load_data_list()
+    assert len(list_bot.list_store) == len(BAD_ROWS)
+    assert list_bot.list_store.get("Item B").timestamp == 0.0
+
+
+@pytest.mark.parametrize("sort_key", ["sort_config_cost", "sort_config_item", "sort_config_name", "sort_config_owner"])
+def test_store_views_match_reference_with_bad_rows(list_bot, sort_key):
+    list_bot.list_store.replace(BAD_ROWS)
+    config = list_bot.SORT_CONFIGS[sort_key]
+    reference = [row.item for row in config["sort_lambda"](list_bot.list_store.rows())]
+    assert [row.item for row in list_bot.list_store.sorted_rows(config["store_view"])] == reference
+
+
+def test_sqlite_cost_view_matches_store(list_bot, monkeypatch):
+    monkeypatch.setattr(list_bot, "_saved_states_text", None)
+    list_bot.list_store.replace(BAD_ROWS)
+    storage = list_bot.SqliteStorage("list.db")
+    assert storage.apply([("reset", [tuple(row.to_json()) for row in list_bot.list_store])], "{}")
+    assert [row.item for row in storage.query_view("sort_config_cost")] == \
+        [row.item for row in list_bot.list_store.sorted_rows("cost")]
+
+
+@pytest.mark.parametrize("col_indices", [[0, 1, 2], [2, 0], [1]])
+def test_format_list_accepts_listrows_and_plain_rows(list_bot, col_indices):
+    rows = list_bot.ListRow.from_json_rows(BAD_ROWS)
+    headers = ["Col"] * len(col_indices)
+    expected = list_bot.format_list_for_display(rows, col_indices, headers)
+    assert expected[0].splitlines()[1].replace(" ", "") == "".join(str(rows[0][i]) for i in col_indices).replace(" ", "")
+    for plain in ([r.to_json() for r in rows], [tuple(r) for r in rows]):
+        plain = [[r[0], r[1], int(r[2]), r[3]] for r in plain]
+        assert list_bot.format_list_for_display(plain, col_indices, headers) == expected
@@ -0,0 +1,137 @@
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import discord
+import pytest
+
+from benchmarks import make_rows
+
+CHANNEL_ID = 1379541947189821460
+
+
+def _http_error(cls, status):
+    return cls(SimpleNamespace(status=status, reason="injected"), {"message": "injected", "code": 0})
+
+
+class FakeChannel:
+    """Messages by ID in posting order; `fail` maps a method to the errors its next calls raise."""
+
+    _ids = itertools.count(1000)
+
+    def __init__(self):
+        self.id = CHANNEL_ID
+        self.messages = {}
+        self.fail = {"PATCH": [], "POST": [], "DELETE": []}
+
+    def _maybe_fail(self, method):
+        if self.fail[method]:
+            raise self.fail[method].pop(0)
+
+    async def send(self, content=None, view=None, **kwargs):
+        self._maybe_fail("POST")
+        message = SimpleNamespace(id=next(self._ids))
+        self.messages[message.id] = content
+        return message
+
+    def get_partial_message(self, message_id):
+        channel = self
+
+        class Partial:
+            id = message_id
+
+            async def edit(self, content=None, view=None):
+                channel._maybe_fail("PATCH")
+                if message_id not in channel.messages:
+                    raise _http_error(discord.NotFound, 404)
+                channel.messages[message_id] = content
+
+            async def delete(self):
+                channel._maybe_fail("DELETE")
+                if channel.messages.pop(message_id, None) is None:
+                    raise _http_error(discord.NotFound, 404)
+        return Partial()
+
+    def shown_parts(self, list_bot):
+        """Part bodies (without the timestamp line) in the order the state lists them."""
+        ids = list_bot.channel_list_states[CHANNEL_ID]["message_ids"]
+        return [self.messages.get(mid, "<missing>").split("\n", 1)[-1] for mid in ids]
+
+
+@pytest.fixture
+def synced(list_bot, monkeypatch):
+    channel = FakeChannel()
+    monkeypatch.setattr(list_bot.client, "get_channel", lambda cid: channel if cid == CHANNEL_ID else None)
+    monkeypatch.setattr(list_bot.client, "add_view", lambda view, message_id=None: None)
+    list_bot.list_store.replace(make_rows(400))
+
+    async def sync():
+        await list_bot.send_or_edit_persistent_list_prompt(CHANNEL_ID)
+
+    asyncio.run(sync())
+    return channel, sync
+
+
+def _touch_part(list_bot, channel, message_id):
+    """Forges an item shown in the given message, so that part's text changes."""
+    line = channel.messages[message_id].split("```\n", 1)[1].splitlines()[1]
+    list_bot.list_store.upsert(" ".join(line.split()[:2]), "Forger")
+
+
+def _expected_parts(list_bot):
+    templates = asyncio.run(list_bot.render_list_templates(list_bot.DEFAULT_PERSISTENT_SORT_KEY))
+    return [part.split("\n", 1)[-1] for part in list_bot._stamp_list_templates(templates)]
+
+
+def test_failed_replacement_keeps_later_parts_in_place(list_bot, synced):
+    channel, sync = synced
+    ids = list_bot.channel_list_states[CHANNEL_ID]["message_ids"]
+    assert len(ids) >= 4
+
+    # Part 2 changes but was deleted by hand, and posting its replacement fails once.
+    _touch_part(list_bot, channel, ids[1])
+    del channel.messages[ids[1]]
+    channel.fail["POST"].append(_http_error(discord.DiscordServerError, 503))
+    with pytest.raises(discord.DiscordServerError):
+        asyncio.run(sync())
+
+    state = list_bot.channel_list_states[CHANNEL_ID]
+    assert len(state["message_ids"]) == len(ids)
+    assert state["message_ids"][2:] == ids[2:]
+    assert state["content_hashes"][1] is None
+
+    # The retry sync posts the missing part and leaves every other part where it is.
+    asyncio.run(sync())
+    assert channel.shown_parts(list_bot) == _expected_parts(list_bot)
+    assert len(channel.messages) == len(ids)
+
+
+def test_failed_edit_keeps_message_and_retries(list_bot, synced):
+    channel, sync = synced
+    ids = list(list_bot.channel_list_states[CHANNEL_ID]["message_ids"])
+
+    _touch_part(list_bot, channel, ids[0])
+    channel.fail["PATCH"].append(_http_error(discord.DiscordServerError, 503))
+    with pytest.raises(discord.DiscordServerError):
+        asyncio.run(sync())
+    assert list_bot.channel_list_states[CHANNEL_ID]["message_ids"] == ids
+
+    asyncio.run(sync())
+    assert list_bot.channel_list_states[CHANNEL_ID]["message_ids"] == ids
+    assert channel.shown_parts(list_bot) == _expected_parts(list_bot)
+    assert len(channel.messages) == len(ids)
+
+
+def test_last_sync_records_each_sync(list_bot, synced):
+    channel, sync = synced
+    parts = len(list_bot.channel_list_states[CHANNEL_ID]["message_ids"])
+
+    asyncio.run(sync())
+    last = list_bot.list_sync_stats["last_sync"][CHANNEL_ID]
+    # Only the timestamp changed: every part is skipped, saving its fetch and edit.
+    assert last == {"api_calls": 0, "api_calls_saved": 2 * parts, "skipped": parts, "parts": parts, "failed": 0}
+
+    _touch_part(list_bot, channel, list_bot.channel_list_states[CHANNEL_ID]["message_ids"][0])
+    asyncio.run(sync())
+    last = list_bot.list_sync_stats["last_sync"][CHANNEL_ID]
+    assert (last["api_calls"], last["skipped"]) == (1, parts - 1)
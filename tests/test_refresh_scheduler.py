@@ -0,0 +1,65 @@
+import asyncio
+
+import discord
+import pytest
+
+from test_list_sync import CHANNEL_ID, FakeChannel, _http_error
+
+
+@pytest.fixture
+def fast_retries(list_bot, monkeypatch):
+    monkeypatch.setattr(list_bot, "REFRESH_DEBOUNCE_SECONDS", 0.0)
+    monkeypatch.setattr(list_bot, "REFRESH_RETRY_SECONDS", 0.02)
+    monkeypatch.setattr(list_bot, "REFRESH_RETRY_MAX_SECONDS", 0.04)
+    return list_bot
+
+
+def test_failed_syncs_back_off_up_to_the_cap(fast_retries, monkeypatch):
+    list_bot = fast_retries
+    starts = []
+
+    async def failing_sync(force_new=False):
+        starts.append(asyncio.get_running_loop().time())
+        if len(starts) <= 5:
+            raise RuntimeError("injected")
+
+    monkeypatch.setattr(list_bot, "update_all_persistent_list_prompts", failing_sync)
+
+    async def run():
+        scheduler = list_bot.ListRefreshScheduler()
+        assert isinstance(await scheduler.request(), RuntimeError)
+        while len(starts) < 6:
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.1)
+        scheduler.task.cancel()
+        return scheduler
+
+    scheduler = asyncio.run(run())
+    # Five failures, then the fifth retry succeeds and nothing is scheduled after it.
+    assert len(starts) == 6
+    assert scheduler.stats["retries"] == 5
+    assert scheduler.stats["failures_in_a_row"] == 0
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    # Uncapped, the last two delays would be 0.16s and 0.32s.
+    for gap, expected in zip(gaps, [0.02, 0.04, 0.04, 0.04, 0.04]):
+        assert expected <= gap < expected + 0.05
+
+
+def test_inaccessible_channel_is_dropped_until_forced(list_bot, monkeypatch):
+    channel = FakeChannel()
+    monkeypatch.setattr(list_bot.client, "get_channel", lambda cid: channel if cid == CHANNEL_ID else None)
+    monkeypatch.setattr(list_bot.client, "add_view", lambda view, message_id=None: None)
+    monkeypatch.setattr(list_bot, "INTERACTIVE_LIST_TARGET_CHANNEL_IDS", [CHANNEL_ID])
+    list_bot.list_store.upsert("Item 1", "Forger")
+
+    channel.fail["POST"].append(_http_error(discord.Forbidden, 403))
+    with pytest.raises(discord.Forbidden):
+        asyncio.run(list_bot.update_all_persistent_list_prompts())
+    assert CHANNEL_ID in list_bot.unreachable_list_channels
+
+    # Regular refreshes leave the channel alone; a forced one tries again and clears it.
+    asyncio.run(list_bot.update_all_persistent_list_prompts())
+    assert channel.messages == {}
+    asyncio.run(list_bot.update_all_persistent_list_prompts(force_new=True))
+    assert len(channel.messages) == 1
+    assert CHANNEL_ID not in list_bot.unreachable_list_channels
@@ -0,0 +1,130 @@
+import asyncio
+
+import aiohttp.web
+import pytest
+
+from list_bot import ServerCodeCache, ServerCodeError, ServerCodePoller
+
+
+class FindEachStub:
+    """Local findEach endpoint: answers with `servers[map_id]`, counts requests per map,
+    and can delay or fail them."""
+
+    def __init__(self):
+        self.servers = {}
+        self.status = {}
+        self.delay = 0.0
+        self.requests = {}
+        self.runner = None
+        self.url_template = None
+
+    async def handle(self, request):
+        map_id = int(request.match_info["map_id"])
+        self.requests[map_id] = self.requests.get(map_id, 0) + 1
+        await asyncio.sleep(self.delay)
+        status = self.status.get(map_id, 200)
+        if status != 200:
+            return aiohttp.web.json_response({"error": "injected"}, status=status)
+        return aiohttp.web.json_response({"servers": self.servers.get(map_id, {})})
+
+    async def __aenter__(self):
+        app = aiohttp.web.Application()
+        app.router.add_get("/endpoint/florrio-map-{map_id}-green/findEach/", self.handle)
+        self.runner = aiohttp.web.AppRunner(app)
+        await self.runner.setup()
+        site = aiohttp.web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.url_template = f"http://127.0.0.1:{port}/endpoint/florrio-map-{{}}-green/findEach/"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.runner.cleanup()
+
+
+def run_with_stub(test):
+    """Runs `test(stub, cache)` against a fresh stub and cache (TTL 50 ms, stale for 10 s)."""
+    async def main():
+        async with FindEachStub() as stub:
+            cache = ServerCodeCache(stub.url_template, ttl=0.05, stale_ttl=10)
+            try:
+                await test(stub, cache)
+            finally:
+                await cache.close()
+    asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_fetch():
+    async def test(stub, cache):
+        stub.servers[0] = {"eu-1": {"id": "a1"}}
+        stub.delay = 0.05
+        results = await asyncio.gather(*(cache.get(0) for _ in range(10)))
+        assert all(data == {"servers": {"eu-1": {"id": "a1"}}} for data in results)
+        assert stub.requests == {0: 1}
+        assert (cache.stats["misses"], cache.stats["fetches"]) == (10, 1)
+    run_with_stub(test)
+
+
+def test_stale_entry_is_served_while_the_change_is_fetched():
+    async def test(stub, cache):
+        stub.servers[0] = {"eu-1": {"id": "old"}}
+        assert (await cache.get(0))["servers"]["eu-1"]["id"] == "old"
+
+        # Within the TTL the upstream change is not seen and nothing is fetched.
+        stub.servers[0] = {"eu-1": {"id": "new"}}
+        assert (await cache.get(0))["servers"]["eu-1"]["id"] == "old"
+        assert stub.requests == {0: 1}
+
+        # Past the TTL the old data is answered at once while one fetch picks up the change.
+        await asyncio.sleep(0.06)
+        stale = await asyncio.gather(cache.get(0), cache.get(0))
+        assert [data["servers"]["eu-1"]["id"] for data in stale] == ["old", "old"]
+        await cache.refresh(0)
+        assert (await cache.get(0))["servers"]["eu-1"]["id"] == "new"
+        assert stub.requests == {0: 2}
+        assert cache.stats["stale_hits"] == 2
+    run_with_stub(test)
+
+
+def test_upstream_errors_keep_the_cached_data():
+    async def test(stub, cache):
+        stub.status[0] = 500
+        with pytest.raises(ServerCodeError, match="HTTP 500"):
+            await cache.get(0)
+        assert cache.cached(0) is None
+
+        stub.status[0] = 200
+        stub.servers[0] = {"us-1": {"id": "b2"}}
+        await cache.get(0)
+        await asyncio.sleep(0.06)
+        stub.status[0] = 503
+        assert (await cache.get(0))["servers"] == {"us-1": {"id": "b2"}}
+        with pytest.raises(ServerCodeError):
+            await cache.refresh(0)
+        assert cache.cached(0)[1]["servers"] == {"us-1": {"id": "b2"}}
+        assert cache.stats["errors"] == 2
+    run_with_stub(test)
+
+
+def test_poller_refreshes_every_map_and_counts_failures():
+    async def test(stub, cache):
+        poller = ServerCodePoller(cache, map_count=3, interval=60)
+        assert poller.snapshot_age() is None
+        stub.servers = {0: {"eu-1": {"id": "m0"}}, 2: {"as-1": {"id": "m2"}}}
+        stub.status[1] = 502
+
+        await poller.poll_once()
+        assert poller.stats["polls"] == 1 and poller.stats["errors"] == 1
+        assert cache.cached(1) is None
+        assert cache.cached(2)[1]["servers"] == {"as-1": {"id": "m2"}}
+
+        # The next poll picks up changed codes and the map that failed before.
+        stub.servers[0] = {"eu-1": {"id": "m0-new"}}
+        stub.status[1] = 200
+        await poller.poll_once()
+        assert poller.stats["errors"] == 1
+        assert cache.cached(0)[1]["servers"] == {"eu-1": {"id": "m0-new"}}
+        assert cache.cached(1)[1]["servers"] == {}
+        assert stub.requests == {0: 2, 1: 2, 2: 2}
+        assert poller.snapshot_age() < 1
+    run_with_stub(test)
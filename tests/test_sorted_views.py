@@ -0,0 +1,102 @@
+import random
+import time
+
+import pytest
+
+from benchmarks import make_rows
+
+WEEK = 7 * 86400
+
+
+class Model:
+    """A plain dict of [item, name, cost, timestamp, update seq] per lowercased item,
+    with every view sorted from scratch by its documented order."""
+
+    def __init__(self, rows):
+        self.rows = {}
+        self.seq = 0
+        for item, name, cost, timestamp in rows:
+            self.put(item, name, int(cost), timestamp)
+
+    def put(self, item, name, cost, timestamp):
+        self.seq += 1
+        self.rows[item.lower()] = [item, name, cost, timestamp, self.seq]
+
+    def upsert(self, item, name, cost, timestamp):
+        old = self.rows.get(item.lower())
+        if old is not None:
+            item = old[0]
+            cost = old[2] + 1 if cost is None else cost
+        self.put(item, name, 1 if cost is None else cost, timestamp)
+
+    def delete(self, item):
+        self.rows.pop(item.lower(), None)
+
+    def view(self, name, now):
+        rows = list(self.rows.values())
+        owned = {}
+        for row in rows:
+            owned[row[1].lower()] = owned.get(row[1].lower(), 0) + 1
+        if name == "item":
+            rows.sort(key=lambda r: r[0].lower())
+        elif name == "name":
+            rows.sort(key=lambda r: (r[1].lower(), r[0].lower()))
+        elif name == "cost":
+            rows.sort(key=lambda r: (max(r[2], 0), r[0].lower()))
+        elif name == "owner":
+            rows.sort(key=lambda r: (-owned[r[1].lower()], r[1].lower(), -r[2], r[4]))
+        elif name == "recent":
+            # Newest timestamp first; equal timestamps show the latest update first.
+            rows = [r for r in rows if r[3] >= now - WEEK]
+            rows.sort(key=lambda r: (-r[3], -r[4]))
+        return [(r[0], r[1], r[2], r[3]) for r in rows]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_views_match_reference_after_random_mutations(list_bot, seed):
+    rnd = random.Random(seed)
+    now = time.time()
+    rows = make_rows(500, seed)
+    store = list_bot.ListStore([list(r) for r in rows])
+    model = Model(rows)
+    items = [r[0] for r in rows] + [f"New {i}" for i in range(50)]
+    owners = sorted({r[1] for r in rows}) + ["NEWCOMER", "newcomer"]
+
+    for step in range(3_000):
+        roll = rnd.random()
+        item = rnd.choice(items)
+        if rnd.random() < 0.1:
+            item = item.upper()
+        owner = rnd.choice(owners)
+        # Whole seconds, so equal timestamps (and their tie order) come up often.
+        timestamp = float(int(now) - rnd.randint(0, 10 * 86400) // 3600 * 3600)
+        if roll < 0.45:
+            store.upsert(item, owner, timestamp=timestamp)
+            model.upsert(item, owner, None, timestamp)
+        elif roll < 0.65:
+            cost = rnd.randint(-3, 60)
+            store.upsert(item, owner, cost=cost, timestamp=timestamp)
+            model.upsert(item, owner, cost, timestamp)
+        elif roll < 0.8:
+            # A full row, as a backfill writes it: spelling and all fields replaced.
+            cost = rnd.randint(0, 60)
+            store.put([item, owner, str(cost), timestamp])
+            model.put(item, owner, cost, timestamp)
+        else:
+            store.delete(item)
+            model.delete(item)
+
+        if step % 250 == 0 or step == 2_999:
+            for view in ("item", "name", "cost", "owner", "recent"):
+                actual = [(r.item, r.name, r.cost, r.timestamp) for r in store.sorted_rows(view)]
+                assert actual == model.view(view, time.time()), f"{view} view diverged at step {step}"
+
+
+def test_views_match_reference_after_replace(list_bot):
+    rows = make_rows(300, 9)
+    # Duplicates in another case: the last row wins and takes the later update position.
+    rows += [[r[0].lower(), "Dup", "7", r[3]] for r in rows[::17]]
+    store = list_bot.ListStore(rows)
+    model = Model(rows)
+    for view in ("item", "name", "cost", "owner", "recent"):
+        assert [(r.item, r.name, r.cost, r.timestamp) for r in store.sorted_rows(view)] == model.view(view, time.time())